@@ -0,0 +1,59 @@
+"""Compares the sync and the async JIRA client fetching issues from a local fake JIRA with latency.
+
+Run from the repository root:
+
+    python -m benchmarks.clients --issues 2000 --latency 0.05 --batch-size 1
+"""
+import argparse
+import os
+import time
+
+from benchmarks.fake_jira import FakeJira
+from jira_tools.config import ConfigAndOptions
+from jira_tools.search import create_jira_search
+
+
+def run(fake, client, batch_size, keys):
+    config = ConfigAndOptions().apply_defaults(
+        {"jira": {"url": fake.url, "client": client, "batch_size": batch_size}}
+    )
+    jira = create_jira_search(config, argparse.Namespace(debug=False))
+
+    request_count = fake.request_count
+    start = time.perf_counter()
+    issues = jira.get_issues(keys)
+    duration = time.perf_counter() - start
+    jira.close()
+
+    print(
+        "{: <6} issues: {: <6} requests: {: <6} time: {:.3f}s".format(
+            client, len(issues), fake.request_count - request_count, duration
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--issues", dest="issues", type=int, default=1000)
+    parser.add_argument("--latency", dest="latency", type=float, default=0.05)
+    parser.add_argument(
+        "--batch-size",
+        dest="batch_size",
+        type=int,
+        default=1,
+        help="issues per request, 1 fetches every issue with its own request",
+    )
+    options = parser.parse_args()
+
+    os.environ.setdefault("JIRA_ACCESS_TOKEN", "benchmark")
+    fake = FakeJira(issues=options.issues, latency=options.latency).start()
+    keys = ["DEMO-{}".format(i) for i in range(options.issues)]
+    try:
+        for client in ["sync", "async"]:
+            run(fake, client, options.batch_size, keys)
+    finally:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Runs the dependency graph and the query tool end to end against a local fake JIRA serving a tree of issues and
+reports wall time, requests, transferred bytes and peak memory of each run.
+
+Run from the repository root:
+
+    python -m benchmarks.end_to_end --depth 4 --fan-out 4 --payload-size 5000 --latency 0.02
+
+Every run happens in a fresh process, so the peak RSS is the one of the tool only. Rendering the image needs the
+graphviz `dot` binary, use `--no-image` to measure without it.
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from multiprocessing import get_context
+
+from benchmarks.fake_jira import FakeJira
+
+
+def run_tool(tool, args):
+    """Runs the tool with the given command line arguments and returns the wall time and the peak RSS in KiB."""
+    # imported here, so they are part of the measured process only
+    from jira_tools.config import ConfigAndOptions
+    from jira_tools.dependency_graph import DotGenerator
+    from jira_tools.query import JiraTraversal
+    from jira_tools.search import create_jira_search
+
+    os.environ.setdefault("JIRA_ACCESS_TOKEN", "benchmark")
+    start = time.perf_counter()
+    config, options = ConfigAndOptions().get_config_and_options(args)
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        if tool == "graph":
+            jira = create_jira_search(config, options, DotGenerator.get_fields(config))
+            DotGenerator(config, options, jira).generate_graph(
+                options.image_file_name, print_only=options.no_image
+            )
+        else:
+            jira = create_jira_search(config, options, JiraTraversal.get_fields(config))
+            JiraTraversal(config, options, jira).print_issue(options.issues[0])
+    jira.close()
+
+    return {
+        "time": time.perf_counter() - start,
+        # KiB on Linux
+        "peak_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def run(fake, tool, args):
+    request_count = fake.request_count
+    bytes_sent = fake.bytes_sent
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+        result = pool.submit(run_tool, tool, args).result()
+
+    print(
+        "{: <6} time: {:.3f}s  requests: {: <6} bytes: {: <10} peak RSS: {:.1f} MiB".format(
+            tool,
+            result["time"],
+            fake.request_count - request_count,
+            fake.bytes_sent - bytes_sent,
+            result["peak_rss"] / 1024,
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--depth", dest="depth", type=int, default=3)
+    parser.add_argument("--fan-out", dest="fan_out", type=int, default=3)
+    parser.add_argument(
+        "--payload-size",
+        dest="payload_size",
+        type=int,
+        default=2000,
+        help="characters of the description of every issue",
+    )
+    parser.add_argument("--latency", dest="latency", type=float, default=0.01)
+    parser.add_argument(
+        "--max-depth",
+        dest="max_depth",
+        type=int,
+        default=None,
+        help="how many links the tools follow, defaults to the depth of the tree",
+    )
+    parser.add_argument(
+        "--client", dest="client", choices=["sync", "async"], default="sync"
+    )
+    parser.add_argument(
+        "--config-file",
+        dest="config_file",
+        default=None,
+        help="config to take the overrides and layout from, the jira section is replaced",
+    )
+    parser.add_argument(
+        "--tool",
+        dest="tools",
+        action="append",
+        choices=["graph", "query"],
+        default=None,
+        help="tool to run, can be repeated - default: both",
+    )
+    parser.add_argument("--no-image", dest="no_image", action="store_true")
+    options = parser.parse_args()
+
+    config = {}
+    if options.config_file is not None:
+        with open(options.config_file) as config_file:
+            config = json.loads(config_file.read())
+    config["jira"] = {"client": options.client}
+
+    fake = FakeJira(
+        fan_out=options.fan_out,
+        latency=options.latency,
+        depth=options.depth,
+        payload_size=options.payload_size,
+    ).start()
+    config["jira"]["url"] = fake.url
+    print(
+        "{} issues, fan out {}, depth {}, payload {} characters, latency {}s".format(
+            fake.issues,
+            options.fan_out,
+            options.depth,
+            options.payload_size,
+            options.latency,
+        ),
+        file=sys.stderr,
+    )
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            config_file_name = os.path.join(directory, "config.json")
+            with open(config_file_name, "w") as config_file:
+                config_file.write(json.dumps(config))
+
+            args = [
+                "--config-file",
+                config_file_name,
+                "--file-name",
+                os.path.join(directory, "output"),
+                "--max-depth",
+                str(options.depth if options.max_depth is None else options.max_depth),
+                "--force-render",
+                "DEMO-0",
+            ]
+            if options.no_image:
+                args.append("--no-image")
+
+            for tool in options.tools or ["graph", "query"]:
+                run(fake, tool, args)
+    finally:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # the default backlog of 5 drops connections if many requests are started at once
+    request_queue_size = 1024
+
+
+class FakeJira:
+    """Local stand-in for the JIRA REST API, serving a synthetic graph of issues. Issue `DEMO-i` links outward to
+    the issues `DEMO-(i * fan_out + 1)` to `DEMO-(i * fan_out + fan_out)`, as long as they exist. If `depth` is given,
+    the number of issues is that of a complete tree of this depth below `DEMO-0`. The description of every issue is
+    padded to `payload_size` characters and every response is delayed by `latency` seconds. Only the requested
+    fields are returned like JIRA does. Issues can be renamed to simulate edits, see `rename_issue`."""
+
+    def __init__(self, issues=100, fan_out=2, latency=0.0, depth=None, payload_size=0):
+        if depth is not None:
+            issues = sum(fan_out**level for level in range(depth + 1))
+        self.issues = issues
+        self.fan_out = fan_out
+        self.latency = latency
+        self.payload_size = payload_size
+        self.request_count = 0
+        # index -> summary of the renamed issues
+        self.summaries = {}
+        # indexes of the renamed issues, they are the result of searches for updated issues
+        self.updated = set()
+        # bytes of all response bodies
+        self.bytes_sent = 0
+        self.__lock = threading.Lock()
+        self.__server = Server(("127.0.0.1", 0), self.__create_handler())
+        self.url = "http://127.0.0.1:{}".format(self.__server.server_port)
+
+    def start(self):
+        threading.Thread(target=self.__server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.__server.shutdown()
+        self.__server.server_close()
+
+    def rename_issue(self, index, summary):
+        """Changes the summary of an issue like an edit in JIRA, the links to it show the new summary as well."""
+        with self.__lock:
+            self.summaries[index] = summary
+            self.updated.add(index)
+
+    def get_summary(self, index):
+        return self.summaries.get(index, "Issue {}".format(index))
+
+    def create_issue(self, index):
+        key = "DEMO-{}".format(index)
+        links = []
+        for linked_index in range(
+            index * self.fan_out + 1, index * self.fan_out + self.fan_out + 1
+        ):
+            if linked_index < self.issues:
+                links.append(
+                    {
+                        "type": {
+                            "name": "Relates",
+                            "inward": "relates to",
+                            "outward": "relates to",
+                        },
+                        "outwardIssue": {
+                            "key": "DEMO-{}".format(linked_index),
+                            # the stub JIRA embeds in the link
+                            "fields": {
+                                "summary": self.get_summary(linked_index),
+                                "status": {"name": "Open"},
+                                "issuetype": {"name": "Story"},
+                            },
+                        },
+                    }
+                )
+        description = "h3. Estimation\nM\n"
+        return {
+            "id": str(10000 + index),
+            "key": key,
+            "fields": {
+                "summary": self.get_summary(index),
+                "status": {"name": "Open"},
+                "description": description.ljust(self.payload_size, "x"),
+                "issuetype": {"name": "Story"},
+                "labels": ["label-{}".format(index % 3)],
+                "issuelinks": links,
+                "subtasks": [],
+            },
+        }
+
+    def __get_index(self, key):
+        match = re.match(r"^DEMO-(\d+)$", key.strip().strip('"'))
+        if match is None or int(match.group(1)) >= self.issues:
+            return None
+        return int(match.group(1))
+
+    def __project(self, issue, fields):
+        """Reduces the issue to the requested comma separated fields, all fields are returned if none are given."""
+        if fields is None:
+            return issue
+        fields = fields.split(",")
+        return {
+            "id": issue["id"],
+            "key": issue["key"],
+            "fields": {
+                name: value for name, value in issue["fields"].items() if name in fields
+            },
+        }
+
+    def __search(self, jql, fields, start_at, max_results):
+        keys = re.match(r"^key in \((.*)\)$", jql)
+        if keys is not None:
+            indexes = [self.__get_index(key) for key in keys.group(1).split(",")]
+            indexes = [index for index in indexes if index is not None]
+        elif jql.startswith("updated"):
+            # only the renamed issues changed since the last run
+            indexes = sorted(self.updated)
+        else:
+            indexes = list(range(self.issues))
+
+        return {
+            "startAt": start_at,
+            "maxResults": max_results,
+            "total": len(indexes),
+            "issues": [
+                self.__project(self.create_issue(index), fields)
+                for index in indexes[start_at : start_at + max_results]
+            ],
+        }
+
+    def __respond(self, path):
+        url = urlparse(path)
+        params = parse_qs(url.query)
+        fields = params.get("fields", [None])[0]
+
+        issue = re.match(r"^/rest/api/latest/issue/(.+)$", url.path)
+        if issue is not None:
+            index = self.__get_index(issue.group(1))
+            if index is None:
+                return 404, {"errorMessages": ["Issue Does Not Exist"]}
+            return 200, self.__project(self.create_issue(index), fields)
+
+        if url.path == "/rest/api/latest/search":
+            return 200, self.__search(
+                params.get("jql", [""])[0],
+                fields,
+                int(params.get("startAt", ["0"])[0]),
+                int(params.get("maxResults", ["50"])[0]),
+            )
+
+        return 404, {}
+
+    def handle(self, path):
+        """Returns the status code and the encoded JSON body for the requested path."""
+        time.sleep(self.latency)
+        status, body = self.__respond(path)
+        content = json.dumps(body).encode("utf-8")
+        with self.__lock:
+            self.request_count += 1
+            self.bytes_sent += len(content)
+        return status, content
+
+    def __create_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # keep-alive, so connection pooling of the clients is effective
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                status, content = fake.handle(self.path)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+        return Handler
@@ -0,0 +1,62 @@
+"""Measures the analysis of a dependency graph (cycles, topological order and critical path) on a random graph.
+
+Run from the repository root:
+
+    python -m benchmarks.graph_analysis --nodes 20000 --edges 50000 --cycles 10
+"""
+import argparse
+import random
+import time
+
+from jira_tools.analysis import GraphAnalysis
+from jira_tools.graph import Graph
+
+
+def create_graph(nodes, edges, cycles):
+    """Creates a random graph whose edges point to later nodes, plus the given number of edges reversing an existing
+    edge, each of which closes a cycle."""
+    graph = Graph()
+    for i in range(nodes):
+        graph.add_node("DEMO-{}".format(i), {})
+    while len(graph.edges) < edges:
+        from_index = random.randrange(nodes - 1)
+        to_index = random.randrange(from_index + 1, nodes)
+        graph.add_edge(
+            "DEMO-{}".format(from_index), "DEMO-{}".format(to_index), "blocks"
+        )
+    for from_key, to_key, _ in random.sample(list(graph.edges), cycles):
+        graph.add_edge(to_key, from_key, "blocks")
+    return graph
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", dest="nodes", type=int, default=20000)
+    parser.add_argument("--edges", dest="edges", type=int, default=50000)
+    parser.add_argument("--cycles", dest="cycles", type=int, default=10)
+    options = parser.parse_args()
+
+    graph = create_graph(options.nodes, options.edges, options.cycles)
+    weights = {issue_key: random.choice([1, 2, 3, 5, 8]) for issue_key in graph.nodes}
+
+    start = time.perf_counter()
+    analysis = GraphAnalysis(graph, weights)
+    components_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    path, _, weight = analysis.critical_path()
+    path_time = time.perf_counter() - start
+
+    print("nodes:            {}".format(len(graph.nodes)))
+    print("edges:            {}".format(len(graph.edges)))
+    print("cycles:           {}".format(len(analysis.cycles)))
+    print("components:       {:.3f} ms".format(components_time * 1000))
+    print(
+        "critical path:    {:.3f} ms, {} issues, weight {}".format(
+            path_time * 1000, len(path), weight
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
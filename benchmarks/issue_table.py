@@ -0,0 +1,82 @@
+"""Compares the memory of keeping the JSON of search results with the columns of an IssueTable and measures the
+aggregation.
+
+Run from the repository root:
+
+    python -m benchmarks.issue_table --issues 10000 --payload-size 2000
+"""
+import argparse
+import json
+import random
+import time
+import tracemalloc
+
+from jira_tools.columns import IssueTable
+from jira_tools.config import ConfigAndOptions
+
+
+def create_issue(i, payload_size):
+    """Creates a synthetic issue as JSON, so every issue has its own strings like a parsed search result."""
+    return json.dumps(
+        {
+            "key": "DEMO-{}".format(i),
+            "fields": {
+                "summary": "Issue {}".format(i),
+                "status": {"name": random.choice(["Open", "In Progress", "Done"])},
+                "issuetype": {"name": random.choice(["Story", "Bug", "Task"])},
+                "project": {"key": "DEMO", "name": "Demo"},
+                "labels": random.sample(["a", "b", "c", "d"], k=2),
+                "description": "h3. Estimation\n{}\n{}".format(
+                    random.choice(["S", "M", "L", "XL"]), "x" * payload_size
+                ),
+                "issuelinks": [
+                    {"type": {"name": "Blocks"}, "outwardIssue": {"key": "DEMO-0"}}
+                ],
+            },
+        }
+    )
+
+
+def measure(function):
+    """Returns the result of the function and the memory it still holds afterwards in MiB."""
+    tracemalloc.start()
+    result = function()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, memory / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--issues", dest="issues", type=int, default=10000)
+    parser.add_argument("--payload-size", dest="payload_size", type=int, default=2000)
+    options = parser.parse_args()
+
+    config = ConfigAndOptions().apply_defaults({"jira": {}})
+    issues = [create_issue(i, options.payload_size) for i in range(options.issues)]
+
+    _, json_memory = measure(lambda: [json.loads(issue) for issue in issues])
+
+    def fill_table():
+        table = IssueTable(config)
+        table.extend(json.loads(issue) for issue in issues)
+        return table
+
+    table, table_memory = measure(fill_table)
+
+    start = time.perf_counter()
+    rows = table.aggregate(["status", "estimation"])
+    aggregate_time = time.perf_counter() - start
+
+    print("issues:           {}".format(len(table)))
+    print("JSON:             {:.1f} MiB".format(json_memory))
+    print("table:            {:.1f} MiB".format(table_memory))
+    print(
+        "aggregation:      {:.3f} ms for {} groups".format(
+            aggregate_time * 1000, len(rows)
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
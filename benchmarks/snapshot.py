@@ -0,0 +1,103 @@
+"""Measures writing a snapshot of a tree of issues, loading it and traversing it offline.
+
+Run from the repository root:
+
+    python -m benchmarks.snapshot --depth 8 --fan-out 3 --payload-size 2000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from jira_tools.config import ConfigAndOptions
+from jira_tools.snapshot import SnapshotSearch, SnapshotWriter
+from jira_tools.traversal import IssueTraversal
+
+
+def create_issue(i, payload_size):
+    """Creates a synthetic issue with the description holding the estimation and a payload."""
+    return {
+        "key": "DEMO-{}".format(i),
+        "fields": {
+            "summary": "Issue {}".format(i),
+            "status": {"name": "Open"},
+            "issuetype": {"name": "Story"},
+            "labels": ["l{}".format(i % 10)],
+            "description": "h3. Estimation\nM\n" + "x" * payload_size,
+        },
+    }
+
+
+def create_link(key):
+    """Creates an outward link to the issue like IssueTraversal hands it out, without the linked issue."""
+    return {
+        "direction": "outward",
+        "key": key,
+        "label": "relates to",
+        "link": {
+            "type": {"name": "Relates", "outward": "relates to"},
+            "outwardIssue": {"key": key},
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--depth", dest="depth", type=int, default=8)
+    parser.add_argument("--fan-out", dest="fan_out", type=int, default=3)
+    parser.add_argument("--payload-size", dest="payload_size", type=int, default=2000)
+    options = parser.parse_args()
+
+    config = ConfigAndOptions().apply_defaults({"jira": {}})
+    config["jira"]["issue_excludes"] = []
+    config["jira"]["directions"] = ["inward", "outward"]
+    config["jira"]["show_directions"] = ["inward", "outward"]
+    options.max_depth = options.depth + 1
+    options.debug = False
+
+    # a tree where issue i links to the issues fan_out * i + 1 ... fan_out * i + fan_out
+    issues = [create_issue(0, options.payload_size)]
+    parents = 1
+    for _ in range(options.depth):
+        parents *= options.fan_out
+        issues.extend(
+            create_issue(len(issues) + i, options.payload_size) for i in range(parents)
+        )
+
+    with tempfile.TemporaryDirectory() as directory:
+        file_name = os.path.join(directory, "snapshot.jsonl")
+        start = time.perf_counter()
+        snapshot = SnapshotWriter(
+            config, options, file_name, SnapshotWriter.get_fields(config) | {"summary"}
+        )
+        for i, issue in enumerate(issues):
+            children = range(
+                options.fan_out * i + 1, options.fan_out * i + 1 + options.fan_out
+            )
+            links = [create_link(issues[j]["key"]) for j in children if j < len(issues)]
+            for link, j in zip(links, children):
+                link["issue"] = issues[j]
+            snapshot.add(issue, 0 if i == 0 else 1, links)
+        snapshot.close()
+        write_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        jira = SnapshotSearch(config, options, file_name)
+        load_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        visited = sum(
+            1 for _ in IssueTraversal(config, options, jira).walk(jira.issue_keys)
+        )
+        walk_time = time.perf_counter() - start
+        size = os.path.getsize(file_name)
+
+    print("issues:           {}".format(len(issues)))
+    print("file:             {:.1f} MiB".format(size / 1024 / 1024))
+    print("write:            {:.3f} s".format(write_time))
+    print("load:             {:.3f} s".format(load_time))
+    print("traversal:        {:.3f} s for {} issues".format(walk_time, visited))
+
+
+if __name__ == "__main__":
+    main()
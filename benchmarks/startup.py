@@ -0,0 +1,105 @@
+"""Measures the start up time of the commands of `python -m jira_tools` and checks it against a budget. Fails with
+exit code 1 if `--help` of a command takes longer than the budget above a bare interpreter start or loads one of the
+modules that should only be imported when the command runs.
+
+Run from the repository root:
+
+    python -m benchmarks.startup --runs 10 --budget-ms 50
+"""
+import argparse
+import re
+import subprocess
+import sys
+import time
+
+from jira_tools.cli import COMMANDS
+
+# modules that are too expensive for --help, they are only imported to run a command
+DEFERRED_MODULES = [
+    "requests",
+    "aiohttp",
+    "jira_tools.search",
+    "jira_tools.dependency_graph",
+    "jira_tools.query",
+]
+
+
+def measure(args, runs):
+    """Returns the fastest wall time in seconds of running the python interpreter with the given arguments."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable] + args,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=False,
+        )
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def get_imported_modules(args) -> dict:
+    """Returns a dict of the modules imported by running the python interpreter with the given arguments to their
+    cumulative import time in microseconds."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime"] + args,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=False,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|(\s*)(\S+)", line)
+        if match is not None:
+            modules[match.group(3)] = int(match.group(1))
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", dest="runs", type=int, default=10)
+    parser.add_argument(
+        "--budget-ms",
+        dest="budget_ms",
+        type=float,
+        default=50,
+        help="allowed milliseconds of --help above a bare interpreter start",
+    )
+    options = parser.parse_args()
+
+    baseline = measure(["-c", "pass"], options.runs)
+    print("interpreter start:      {:.1f} ms".format(baseline * 1000))
+
+    failed = False
+    for command in COMMANDS:
+        args = ["-m", "jira_tools", command, "--help"]
+        overhead = (measure(args, options.runs) - baseline) * 1000
+        loaded = sorted(
+            module
+            for module in get_imported_modules(args)
+            if module in DEFERRED_MODULES
+        )
+        ok = overhead <= options.budget_ms and len(loaded) == 0
+        failed |= not ok
+        print(
+            "{: <6} --help:          {:.1f} ms {}{}".format(
+                command,
+                overhead,
+                "ok" if ok else "FAILED",
+                "" if len(loaded) == 0 else " - loads " + ", ".join(loaded),
+            )
+        )
+
+    # for comparison, the import time of the modules of a graph run, the dependency graph includes requests
+    modules = get_imported_modules(["-c", "import jira_tools.dependency_graph"])
+    for module in ["requests", "jira_tools.dependency_graph"]:
+        print("import {: <27} {:.1f} ms".format(module, modules.get(module, 0) / 1000))
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Measures the cost of evaluating the style overrides per node.
+
+Run from the repository root:
+
+    python -m benchmarks.style_rules --config-file config_example.json --nodes 10000
+"""
+import argparse
+import json
+import random
+import time
+
+from jira_tools.config import ConfigAndOptions
+from jira_tools.styles import StyleRules
+
+
+def create_issues(count, labels, statuses):
+    """Creates synthetic issue fields with a few random labels and a random status."""
+    return {
+        "DEMO-{}".format(i): {
+            "summary": "Issue {}".format(i),
+            "status": {"name": random.choice(statuses)},
+            "labels": random.sample(labels, k=min(3, len(labels))),
+        }
+        for i in range(count)
+    }
+
+
+def collect_values(overrides, rule_type):
+    values = []
+    for rule in overrides.values():
+        for match_rule in rule["matchRules"]:
+            if match_rule["type"] == rule_type:
+                values.extend(
+                    match_rule["value"]
+                    if isinstance(match_rule["value"], list)
+                    else [match_rule["value"]]
+                )
+    return values
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config-file", dest="config_file", required=True)
+    parser.add_argument("--nodes", dest="nodes", type=int, default=10000)
+    options = parser.parse_args()
+
+    with open(options.config_file) as config_file:
+        config = ConfigAndOptions().apply_defaults(json.loads(config_file.read()))
+
+    overrides = config.get("overrides", {})
+    # use the labels and statuses of the rules, so some of the nodes match
+    labels = collect_values(overrides, "has_label") + ["other-1", "other-2", "other-3"]
+    statuses = collect_values(overrides, "status_in") + ["Open", "Done"]
+    issues = create_issues(options.nodes, labels, statuses)
+
+    start = time.perf_counter()
+    styles = StyleRules(config)
+    compile_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for issue_key, issue_fields in issues.items():
+        styles.get_layout(issue_key, issue_fields)
+    first_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for issue_key, issue_fields in issues.items():
+        styles.get_layout(issue_key, issue_fields)
+    cached_time = time.perf_counter() - start
+
+    print("rules:            {}".format(len(styles.rules)))
+    print("nodes:            {}".format(len(issues)))
+    print("compile:          {:.3f} ms".format(compile_time * 1000))
+    print("evaluation:       {:.3f} us/node".format(first_time * 1e6 / len(issues)))
+    print("cached lookup:    {:.3f} us/node".format(cached_time * 1e6 / len(issues)))
+
+
+if __name__ == "__main__":
+    main()
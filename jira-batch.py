@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+import argparse
+import copy
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+
+from jira_tools.cli import report_unavailable_issues
+from jira_tools.config import ConfigAndOptions
+from jira_tools.dependency_graph import DotGenerator
+from jira_tools.profile import profile
+from jira_tools.search import create_jira_search
+
+
+def load_jobs(jobs_file):
+    with open(jobs_file) as jobs_file:
+        return json.loads(jobs_file.read())
+
+
+def create_job_config(config: dict, job: dict):
+    """Returns the config of the job, the overrides and the layout of the job replace the ones of the config."""
+    job_config = copy.deepcopy(config)
+    for key in ["overrides", "layout"]:
+        if key in job:
+            job_config[key] = copy.deepcopy(job[key])
+    return ConfigAndOptions().apply_defaults(job_config)
+
+
+def create_job_options(options, job: dict):
+    job_options = argparse.Namespace(**vars(options))
+    job_options.image_file_name = job["file_name"]
+    job_options.issues = job.get("issues", [])
+    job_options.jql_query = job.get("jql")
+    job_options.max_depth = job.get("max_depth", options.max_depth)
+    job_options.formats = job.get("formats", options.formats)
+    job_options.components = job.get("components", options.components)
+    return job_options
+
+
+def main():
+    config, options = ConfigAndOptions().get_config_and_options()
+    if options.no_image:
+        sys.exit(
+            '--no-image is not supported in batch mode, use "formats": ["dot"] in the jobs to keep the DOT source'
+        )
+    profile.enabled = options.profile
+    jobs = load_jobs(options.jobs_file)
+    if len(jobs) == 0:
+        print("No jobs in {}".format(options.jobs_file), file=sys.stderr)
+        return
+    job_configs = [create_job_config(config, job) for job in jobs]
+
+    # one client for all jobs, so issues shared between the graphs are fetched once, it fetches the fields needed by
+    # any of the jobs
+    jira = create_jira_search(
+        config,
+        options,
+        set().union(
+            *(DotGenerator.get_fields(job_config) for job_config in job_configs)
+        ),
+    )
+
+    # the graphs are generated one after the other, their rendering runs in parallel while the next ones are generated
+    with ProcessPoolExecutor(
+        max_workers=min(len(jobs), os.cpu_count() or 1)
+    ) as executor:
+        renderings = []
+        for job, job_config in zip(jobs, job_configs):
+            job_options = create_job_options(options, job)
+
+            # if a jql query was given, stream all issues of it after the given issues
+            issue_keys = job_options.issues
+            if job_options.jql_query is not None:
+                issue_keys = chain(
+                    issue_keys,
+                    (issue["key"] for issue in jira.query(job_options.jql_query)),
+                )
+
+            generator = DotGenerator(job_config, job_options, jira, issue_keys)
+            renderings.extend(
+                (generator, image_file_name, rendering)
+                for image_file_name, rendering in generator.generate_graph(
+                    job_options.image_file_name,
+                    keep_dot_file=options.keep_dot_file,
+                    executor=executor,
+                    formats=job_options.formats,
+                )
+            )
+
+        failed = 0
+        for generator, image_file_name, rendering in renderings:
+            try:
+                generator.log_rendering(image_file_name, rendering.result())
+            except Exception as error:
+                failed += 1
+                print(
+                    "Rendering {} failed: {}".format(image_file_name, error),
+                    file=sys.stderr,
+                )
+
+    jira.close()
+    if report_unavailable_issues(
+        jira, [key for job in jobs for key in job.get("issues", [])]
+    ):
+        failed += 1
+
+    if options.profile:
+        profile.report(options.profile_format)
+
+    if failed > 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
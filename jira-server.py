@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+import sys
+
+from jira_tools.config import ConfigAndOptions
+from jira_tools.dependency_graph import DotGenerator
+from jira_tools.query import JiraTraversal
+from jira_tools.search import create_jira_search
+from jira_tools.server import GraphServer, get_ttl
+
+
+def main():
+    config, options = ConfigAndOptions().get_config_and_options()
+    # the server keeps running, so the issues in memory expire
+    config["jira"]["memory_cache"]["ttl"] = get_ttl(config)
+
+    # one client for all requests, it fetches the fields needed by both the graph and the query
+    jira = create_jira_search(
+        config,
+        options,
+        DotGenerator.get_fields(config) | JiraTraversal.get_fields(config),
+    )
+
+    server = GraphServer(config, options, jira)
+    print("Serving on http://{}:{}".format(options.host, options.port), file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server.server_close()
+        jira.close()
+
+
+if __name__ == "__main__":
+    main()
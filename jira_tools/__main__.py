@@ -0,0 +1,3 @@
+from jira_tools.cli import main
+
+main()
@@ -0,0 +1,177 @@
+import math
+
+from jira_tools.extract import FieldExtractors
+from jira_tools.graph import Graph
+
+
+class GraphAnalysis:
+    """Dependency cycles, topological order and critical path of a Graph, each in linear time of the number of nodes
+    and edges. Only the edges whose label is in `edge_labels` are dependencies, all edges if it is empty.
+
+    JIRA shows a link from both of its issues, outward from one and inward from the other. The `inward_edges` point
+    against the dependency and are reversed, so both sides of a link result in the same dependency.
+
+    Nodes of a cycle are taken as one unit: the topological order keeps them next to each other and the critical path
+    passes all of them. The critical path is the path with the highest sum of the weights of its nodes."""
+
+    def __init__(self, graph: Graph, weights: dict, edge_labels=(), inward_edges=()):
+        self.graph = graph
+        # issue key -> weight of the node
+        self.weights = weights
+        edge_labels = frozenset(edge_labels)
+        # edges (from key, to key, label) of inward links
+        self.inward_edges = frozenset(inward_edges)
+        # issue key -> dict as ordered set of the keys of the successors
+        self.successors = {issue_key: {} for issue_key in graph.nodes}
+        for edge in graph.edges:
+            if len(edge_labels) == 0 or edge[2] in edge_labels:
+                from_key, to_key = self.get_dependency(edge)
+                self.successors[from_key][to_key] = True
+
+        self.components = self.__find_components()
+        # issue key -> index of its component in the topological order
+        self.component_ids = {
+            issue_key: index
+            for index, component in enumerate(self.components)
+            for issue_key in component
+        }
+
+    def get_dependency(self, edge) -> tuple:
+        """Returns the tuple (from key, to key) of the dependency of an edge of the graph."""
+        from_key, to_key, _ = edge
+        if edge in self.inward_edges:
+            return to_key, from_key
+        return from_key, to_key
+
+    def __find_components(self) -> list:
+        """Tarjan's algorithm for the strongly connected components, without recursion so deep graphs do not exceed the
+        recursion limit. Returns the components in topological order."""
+        index = {}
+        low = {}
+        stack = []
+        on_stack = set()
+        components = []
+
+        for root in self.successors:
+            if root in index:
+                continue
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            # tuples (node, iterator over its successors) of the current path of the depth first search
+            work = [(root, iter(self.successors[root]))]
+            while len(work) > 0:
+                node, successors = work[-1]
+                for successor in successors:
+                    if successor not in index:
+                        index[successor] = low[successor] = len(index)
+                        stack.append(successor)
+                        on_stack.add(successor)
+                        work.append((successor, iter(self.successors[successor])))
+                        break
+                    if successor in on_stack:
+                        low[node] = min(low[node], index[successor])
+                else:
+                    # all successors are visited
+                    work.pop()
+                    if len(work) > 0:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[node])
+                    if low[node] == index[node]:
+                        component = []
+                        while True:
+                            issue_key = stack.pop()
+                            on_stack.discard(issue_key)
+                            component.append(issue_key)
+                            if issue_key == node:
+                                break
+                        components.append(component[::-1])
+
+        # Tarjan finds the components in reverse topological order
+        return components[::-1]
+
+    @property
+    def cycles(self) -> list:
+        """Lists of the issue keys of each dependency cycle, the largest first."""
+        cycles = [
+            component
+            for component in self.components
+            if len(component) > 1 or component[0] in self.successors[component[0]]
+        ]
+        return sorted(cycles, key=len, reverse=True)
+
+    @property
+    def topological_order(self) -> list:
+        return [issue_key for component in self.components for issue_key in component]
+
+    def critical_path(self) -> tuple:
+        """Returns a tuple (list of the issue keys, list of the edges as tuples (from key, to key), weight) of the
+        path with the highest weight."""
+        component_weights = [
+            sum(self.weights.get(issue_key, 0) for issue_key in component)
+            for component in self.components
+        ]
+        # the weight of the heaviest path ending in the component and the edge it is reached by
+        best = list(component_weights)
+        previous = [None] * len(self.components)
+        for index, component in enumerate(self.components):
+            for issue_key in component:
+                for successor in self.successors[issue_key]:
+                    successor_id = self.component_ids[successor]
+                    if successor_id == index:
+                        continue
+                    weight = best[index] + component_weights[successor_id]
+                    if weight > best[successor_id]:
+                        best[successor_id] = weight
+                        previous[successor_id] = (index, issue_key, successor)
+
+        if len(self.components) == 0:
+            return [], [], 0
+        index = max(range(len(best)), key=best.__getitem__)
+        weight = best[index]
+        # walk back from the end of the path
+        components = [self.components[index]]
+        edges = []
+        while previous[index] is not None:
+            index, from_key, to_key = previous[index]
+            components.append(self.components[index])
+            edges.append((from_key, to_key))
+        path = [
+            issue_key for component in reversed(components) for issue_key in component
+        ]
+        return path, edges[::-1], weight
+
+    def as_dict(self, critical_path=None) -> dict:
+        """Returns the analysis as dict, `critical_path` is the result of `critical_path()` if already computed."""
+        path, _, weight = (
+            self.critical_path() if critical_path is None else critical_path
+        )
+        return {
+            "nodes": len(self.graph.nodes),
+            "edges": sum(len(successors) for successors in self.successors.values()),
+            "cycles": self.cycles,
+            "topological_order": self.topological_order,
+            "critical_path": {"issues": path, "weight": weight},
+        }
+
+
+def get_weights(graph: Graph, config: dict) -> dict:
+    """Returns a dict of issue key to the weight of the node, the value of the `analysis`.`weight` extractor (e.g. the
+    estimation) mapped by `analysis`.`weights` or taken as number."""
+    analysis_config = config["analysis"]
+    extractors = FieldExtractors(config, memoize=False)
+    weights = {}
+    for issue_key, issue_fields in graph.nodes.items():
+        value = extractors.extract({"key": issue_key, "fields": issue_fields})[
+            analysis_config["weight"]
+        ]
+        if value in analysis_config["weights"]:
+            weights[issue_key] = analysis_config["weights"][value]
+            continue
+        try:
+            weights[issue_key] = float(value)
+        except (TypeError, ValueError):
+            weights[issue_key] = analysis_config["default_weight"]
+        if math.isnan(weights[issue_key]):
+            weights[issue_key] = analysis_config["default_weight"]
+    return weights
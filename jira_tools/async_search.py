@@ -0,0 +1,118 @@
+import asyncio
+import json
+import os
+import threading
+import time
+
+import aiohttp
+import requests
+
+from jira_tools.profile import profile
+from jira_tools.search import JiraSearch
+
+
+class AsyncResponse:
+    """The parts of a requests.Response that JiraSearch relies on, for a response fetched with aiohttp."""
+
+    def __init__(self, url, status_code, reason, content):
+        self.url = url
+        self.status_code = status_code
+        self.reason = reason
+        self.content = content
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.HTTPError(
+                "{} {} for url: {}".format(self.status_code, self.reason, self.url),
+                response=self,
+            )
+
+
+class AsyncJiraSearch(JiraSearch):
+    """JIRA client with the same surface as JiraSearch, but all requests run on one asyncio event loop in a background
+    thread. The requests of a batch are started at once and a semaphore limits how many are in flight, given by the
+    `max_requests` config, instead of the thread pool of `max_workers`."""
+
+    def __init__(self, config: dict, options: dict, fields=None):
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        self.__run(self.__open(config))
+        # the parent already fetches while revalidating the cache, so the loop has to be running before
+        super().__init__(config, options, fields)
+
+    def __run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    async def __open(self, config):
+        http_config = config["jira"]["http"]
+        self.semaphore = asyncio.Semaphore(config["jira"]["max_requests"])
+        self.retries = http_config["retries"]
+        self.backoff_factor = http_config["backoff_factor"]
+        self.async_session = aiohttp.ClientSession(
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": "Bearer {}".format(os.environ["JIRA_ACCESS_TOKEN"]),
+            },
+            timeout=aiohttp.ClientTimeout(total=http_config["timeout"]),
+            connector=aiohttp.TCPConnector(limit=config["jira"]["max_requests"]),
+        )
+
+    async def fetch(self, uri, params={}) -> AsyncResponse:
+        """Fetches the uri, retries failed connections and responses with status 429 or 5xx like the sync client."""
+        url = self.url + uri
+        # aiohttp only accepts strings as query values
+        params = {key: str(value) for key, value in params.items()}
+        for attempt in range(self.retries + 1):
+            delay = self.backoff_factor * (2**attempt)
+            try:
+                async with self.semaphore:
+                    start = time.perf_counter()
+                    async with self.async_session.get(url, params=params) as response:
+                        content = await response.read()
+                        profile.record_request(
+                            time.perf_counter() - start,
+                            len(content),
+                            response.status < 400,
+                        )
+                        if (
+                            response.status not in [429, 500, 502, 503, 504]
+                            or attempt == self.retries
+                        ):
+                            return AsyncResponse(
+                                str(response.url),
+                                response.status,
+                                response.reason,
+                                content,
+                            )
+                        # the waiting time JIRA asks for is used instead of the backoff
+                        retry_after = response.headers.get("Retry-After", "")
+                        if retry_after.isdigit():
+                            delay = float(retry_after)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if attempt == self.retries:
+                    raise
+            self.log("Retrying {} in {}s".format(uri, delay))
+            await asyncio.sleep(delay)
+
+    async def __fetch_all(self, calls):
+        return await asyncio.gather(*(self.fetch(uri, params) for uri, params in calls))
+
+    def get(self, uri, params={}):
+        return self.__run(self.fetch(uri, params))
+
+    def get_all(self, calls) -> list:
+        """Runs all given calls, tuples of uri and params, on the event loop and returns the responses in the same
+        order."""
+        return self.__run(self.__fetch_all(calls))
+
+    def close(self):
+        super().close()
+        self.__run(self.async_session.close())
+        self.loop.call_soon_threadsafe(self.loop.stop)
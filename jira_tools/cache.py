@@ -0,0 +1,140 @@
+import json
+import sqlite3
+import threading
+import time
+
+from jira_tools.view import get_linked_keys
+
+
+class IssueCache:
+    """Persistent cache of JIRA issues in a SQLite file. Entries are keyed by the issue key and the set of fields
+    they were fetched with, an entry is only used for a lookup of a subset of its fields. Entries older than the TTL
+    (in seconds) are ignored. The keys the links of an entry point to are indexed, as the links embed a stub of the
+    linked issue which is outdated when that issue changes."""
+
+    # the revalidation covers all field sets, it is stored under this name in the runs table
+    __all_fields = "*"
+
+    def __init__(self, file_name, ttl):
+        self.ttl = ttl
+        self.__lock = threading.Lock()
+        # the cache is filled from the fetch threads of JiraSearch, access is serialized by the lock
+        self.__connection = sqlite3.connect(file_name, check_same_thread=False)
+        self.__connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS issues (
+                key TEXT NOT NULL,
+                fields TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (key, fields)
+            );
+            CREATE TABLE IF NOT EXISTS runs (
+                fields TEXT PRIMARY KEY,
+                last_run REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS links (
+                linked_key TEXT NOT NULL,
+                key TEXT NOT NULL,
+                PRIMARY KEY (linked_key, key)
+            );
+            """
+        )
+
+    def get_many(self, keys, fields) -> dict:
+        """Returns a dict of key to tuple (issue, fields of the entry) for all given keys that have a valid cache entry
+        holding at least the given fields."""
+        keys = list(keys)
+        issues = {}
+        min_fetched_at = time.time() - self.ttl
+        with self.__lock:
+            # stay below the SQLite limit of host parameters per statement
+            for i in range(0, len(keys), 500):
+                chunk = keys[i : i + 500]
+                rows = self.__connection.execute(
+                    "SELECT key, fields, data FROM issues WHERE fetched_at >= ? AND key IN ({})".format(
+                        ",".join("?" * len(chunk))
+                    ),
+                    [min_fetched_at] + chunk,
+                )
+                for key, entry_fields, data in rows:
+                    entry_fields = frozenset(entry_fields.split(","))
+                    if key not in issues and fields <= entry_fields:
+                        issues[key] = (json.loads(data), entry_fields)
+        return issues
+
+    def put_many(self, issues: dict, fields):
+        """Stores the given dict of key to issue, fetched with the given fields."""
+        fields = ",".join(sorted(fields))
+        now = time.time()
+        with self.__lock:
+            self.__connection.executemany(
+                "INSERT OR REPLACE INTO issues (key, fields, fetched_at, data) VALUES (?, ?, ?, ?)",
+                [
+                    (key, fields, now, json.dumps(issue))
+                    for key, issue in issues.items()
+                ],
+            )
+            self.__connection.executemany(
+                "INSERT OR IGNORE INTO links (linked_key, key) VALUES (?, ?)",
+                [
+                    (linked_key, key)
+                    for key, issue in issues.items()
+                    for linked_key in get_linked_keys(issue)
+                ],
+            )
+            self.__connection.commit()
+
+    def get_linking_keys(self, keys) -> set:
+        """Returns the keys of the cached issues whose links point to one of the given keys."""
+        keys = list(keys)
+        linking_keys = set()
+        with self.__lock:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i : i + 500]
+                rows = self.__connection.execute(
+                    "SELECT key FROM links WHERE linked_key IN ({})".format(
+                        ",".join("?" * len(chunk))
+                    ),
+                    chunk,
+                )
+                linking_keys.update(key for (key,) in rows)
+        return linking_keys
+
+    def invalidate(self, keys):
+        """Removes the given issue keys from the cache, for all field sets."""
+        with self.__lock:
+            self.__connection.executemany(
+                "DELETE FROM issues WHERE key = ?", [(key,) for key in keys]
+            )
+            self.__connection.executemany(
+                "DELETE FROM links WHERE key = ?", [(key,) for key in keys]
+            )
+            self.__connection.commit()
+
+    def purge_expired(self):
+        """Removes all entries that are older than the TTL."""
+        with self.__lock:
+            self.__connection.execute(
+                "DELETE FROM issues WHERE fetched_at < ?", (time.time() - self.ttl,)
+            )
+            self.__connection.execute(
+                "DELETE FROM links WHERE key NOT IN (SELECT key FROM issues)"
+            )
+            self.__connection.commit()
+
+    def get_last_run(self):
+        """Returns the timestamp of the last revalidation or None."""
+        with self.__lock:
+            row = self.__connection.execute(
+                "SELECT last_run FROM runs WHERE fields = ?", (self.__all_fields,)
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def set_last_run(self, timestamp):
+        with self.__lock:
+            self.__connection.execute(
+                "INSERT OR REPLACE INTO runs (fields, last_run) VALUES (?, ?)",
+                (self.__all_fields, timestamp),
+            )
+            self.__connection.commit()
@@ -0,0 +1,204 @@
+"""Command line interface of the tools, run as `python -m jira_tools <command> [options]`. The modules a command needs
+are only imported once its arguments are parsed, so `--help` and invalid calls return without loading the HTTP client
+or the graph generation."""
+import argparse
+import sys
+from itertools import chain
+
+from jira_tools.config import ConfigAndOptions
+
+
+def get_issue_keys(jira, options):
+    """Returns the given issues, followed by a stream of the issues of the JQL query if one was given. A snapshot
+    without either is traversed from its own primary issues."""
+    if (
+        options.from_snapshot is not None
+        and len(options.issues) == 0
+        and options.jql_query is None
+    ):
+        return jira.issue_keys
+    if options.jql_query is None:
+        return options.issues
+    return chain(
+        options.issues, (issue["key"] for issue in jira.query(options.jql_query))
+    )
+
+
+def get_fields(config, options, fields) -> set:
+    """Returns the issue fields of a command, with --snapshot including those of the attributes of the nodes."""
+    if options.snapshot is None:
+        return fields
+
+    from jira_tools.snapshot import SnapshotWriter
+
+    return fields | SnapshotWriter.get_fields(config)
+
+
+def create_snapshot(config, options, jira):
+    """Returns the SnapshotWriter for --snapshot, None without it."""
+    if options.snapshot is None:
+        return None
+
+    from jira_tools.snapshot import SnapshotWriter
+
+    return SnapshotWriter(config, options, options.snapshot, jira.fields)
+
+
+def report_unavailable_issues(jira, issue_keys) -> bool:
+    """Prints the issues JIRA reported as missing or forbidden to stderr, they are left out of the output. Returns if
+    any of the given issues is among them."""
+    for key, reason in jira.unavailable_issues.items():
+        print("Skipped {} - unavailable ({})".format(key, reason), file=sys.stderr)
+    return any(key in jira.unavailable_issues for key in issue_keys)
+
+
+# FIXME be able to filter out linked issues based on JIRA fields or project
+# FIXME be able to define multiple label rules for styling the boxes etc. with full set of customization (box color, border color, border thickness, fonts, font color etc.) with fallback to defaults
+def graph(args=None, prog=None):
+    """Generates the dependency graph image."""
+    config, options = ConfigAndOptions().get_config_and_options(args, prog)
+
+    from jira_tools.dependency_graph import DotGenerator
+    from jira_tools.profile import profile
+    from jira_tools.search import create_jira_search
+
+    profile.enabled = options.profile
+
+    jira = create_jira_search(
+        config, options, get_fields(config, options, DotGenerator.get_fields(config))
+    )
+    snapshot = create_snapshot(config, options, jira)
+    DotGenerator(
+        config, options, jira, get_issue_keys(jira, options), snapshot
+    ).generate_graph(
+        options.image_file_name,
+        print_only=options.no_image,
+        keep_dot_file=options.keep_dot_file,
+        formats=options.formats,
+    )
+    if snapshot is not None:
+        snapshot.close()
+    jira.close()
+    unavailable = report_unavailable_issues(jira, options.issues)
+
+    if options.profile:
+        profile.report(options.profile_format)
+
+    if unavailable:
+        sys.exit(1)
+
+
+# FIXME would need a config to only include specific link type instead of blacklisting all unwanted
+def query(args=None, prog=None):
+    """Prints the issues with their linked issues, or the aggregates of --group-by."""
+    config, options = ConfigAndOptions().get_config_and_options(args, prog)
+
+    from jira_tools.profile import profile
+
+    profile.enabled = options.profile
+
+    if options.group_by is not None:
+        unavailable = print_aggregates(config, options)
+    else:
+        from jira_tools.query import JiraTraversal
+        from jira_tools.search import create_jira_search
+
+        jira = create_jira_search(
+            config,
+            options,
+            get_fields(config, options, JiraTraversal.get_fields(config)),
+        )
+        snapshot = create_snapshot(config, options, jira)
+        JiraTraversal(config, options, jira, snapshot=snapshot).print_issues(
+            get_issue_keys(jira, options)
+        )
+        if snapshot is not None:
+            snapshot.close()
+        jira.close()
+        unavailable = report_unavailable_issues(jira, options.issues)
+
+    if options.profile:
+        profile.report(options.profile_format)
+
+    if unavailable:
+        sys.exit(1)
+
+
+def print_aggregates(config, options) -> bool:
+    """Counts the given issues and those of the JQL query by the --group-by columns. The search results are only
+    held in the columns of an IssueTable, not as JSON, only the fields of the used columns are fetched. Returns if any of the given issues is unavailable."""
+    from jira_tools.columns import IssueTable
+    from jira_tools.profile import profile
+    from jira_tools.search import create_jira_search
+    from jira_tools.table import TableWriter
+
+    group_by = options.group_by.split(",")
+    sums = [name for name in options.sums.split(",") if name]
+    # unknown columns fail before any issue is fetched
+    try:
+        table = IssueTable(config, group_by, sums)
+    except ValueError as error:
+        sys.exit(str(error))
+    jira = create_jira_search(config, options, table.fields)
+
+    with profile.phase("aggregate"):
+        issues = jira.get_issues(options.issues)
+        table.extend(issues[key] for key in options.issues if key in issues)
+        if options.jql_query is not None:
+            for issues in jira.search_pages(options.jql_query, fields=table.fields):
+                table.extend(issues)
+        profile.count("issues aggregated", len(table))
+
+        rows = table.aggregate(group_by, sums)
+
+    writer = TableWriter(
+        sys.stdout,
+        options.output_format,
+        group_by + ["count"] + ["sum({})".format(name) for name in sums],
+    )
+    for row in rows:
+        writer.write(row)
+    writer.close()
+    jira.close()
+    return report_unavailable_issues(jira, options.issues)
+
+
+def list_issues(args=None, prog=None):
+    """Prints the keys of the issues of the JQL query, one per line. Only the keys are fetched."""
+    config, options = ConfigAndOptions().get_config_and_options(args, prog)
+    if options.jql_query is None:
+        sys.exit("list needs a JQL query (--jql)")
+
+    from jira_tools.search import create_jira_search
+
+    jira = create_jira_search(config, options, [])
+    for key in jira.list_ids(options.jql_query):
+        print(key)
+    jira.close()
+
+
+# command -> tuple (function, help)
+COMMANDS = {
+    "graph": (graph, "generate the dependency graph image"),
+    "query": (query, "print issues with their linked issues or aggregates of them"),
+    "list": (list_issues, "print the keys of the issues of a JQL query"),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m jira_tools",
+        description="\n".join(
+            "  {: <8} {}".format(name, help) for name, (_, help) in COMMANDS.items()
+        ),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="Run `python -m jira_tools <command> --help` for the options of a command.",
+    )
+    parser.add_argument("command", choices=list(COMMANDS))
+    parser.add_argument(
+        "args", nargs=argparse.REMAINDER, metavar="...", help="options of the command"
+    )
+    arguments = parser.parse_args(argv)
+
+    function = COMMANDS[arguments.command][0]
+    function(arguments.args, "python -m jira_tools " + arguments.command)
@@ -0,0 +1,190 @@
+import math
+from array import array
+from itertools import product
+
+from jira_tools.extract import FieldExtractors
+
+
+class IssueTable:
+    """Compact columnar table of issues for aggregations over large search results. Only the configured columns are
+    kept, not the JSON of the issues: strings are interned into one list and stored as their index in arrays, numbers
+    in arrays of floats. List columns (e.g. labels) hold any number of values per issue, they are stored as one array
+    of values and one array of the offsets of the issues.
+
+    The columns are the `query`.`columns` of the config, the values of the `query`.`extractors` and `link`, the names of
+    the link types of an issue. Extractors with `numbers` are string columns that can be summed up as well, their
+    values are mapped to numbers when aggregating."""
+
+    def __init__(self, config: dict, group_by=None, sums=()):
+        """Only the columns of `group_by` and `sums` are kept and their fields fetched, all columns if `group_by` is
+        None. Raises a ValueError for unknown columns or `sums` that are not number columns, before any issue is
+        fetched."""
+        # name -> tuple (field, type), type is "string", "number" or "list"
+        definitions = {}
+        for name, column in config["query"]["columns"].items():
+            if isinstance(column, str):
+                column = {"field": column}
+            definitions[name] = (column["field"], column.get("type", "string"))
+        extractors = FieldExtractors(config, memoize=False)
+
+        names = list(definitions) + extractors.names + ["link"]
+        if group_by is not None:
+            names = list(dict.fromkeys(list(group_by) + list(sums)))
+        for name in names:
+            if name not in definitions and name not in extractors.names + ["link"]:
+                raise ValueError("Unknown column {}".format(name))
+        for name in sums:
+            if definitions.get(name, (None, None))[1] != "number" and (
+                name not in extractors.numbers
+            ):
+                raise ValueError("Column {} is not a number column".format(name))
+
+        self.definitions = {
+            name: definition
+            for name, definition in definitions.items()
+            if name in names
+        }
+        # every issue is appended once, so there is no need to keep the extracted texts
+        self.extractors = FieldExtractors(config, memoize=False, names=names)
+
+        # interned strings, columns hold their index
+        self.strings = [""]
+        self.__codes = {"": 0}
+        self.keys = []
+        # name -> array of string codes or numbers for single valued columns, tuple (values, offsets) for list columns.
+        # The values of issue i of a list column are values[offsets[i]:offsets[i + 1]].
+        self.columns = {}
+        for name, (_, type) in self.definitions.items():
+            if type == "list":
+                self.columns[name] = (array("I"), array("I", [0]))
+            else:
+                self.columns[name] = array("d" if type == "number" else "I")
+        for name in self.extractors.names:
+            self.columns[name] = array("I")
+        if "link" in names:
+            self.columns["link"] = (array("I"), array("I", [0]))
+
+    @property
+    def fields(self) -> set:
+        """The issue fields needed to fill the table."""
+        fields = {field for field, _ in self.definitions.values()}
+        if "link" in self.columns:
+            fields.add("issuelinks")
+        return fields | self.extractors.fields
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __intern(self, value) -> int:
+        code = self.__codes.get(value)
+        if code is None:
+            code = len(self.strings)
+            self.strings.append(value)
+            self.__codes[value] = code
+        return code
+
+    @staticmethod
+    def __to_string(value) -> str:
+        # objects like status or issuetype are represented by their name, options by their value, issues by their key
+        if isinstance(value, dict):
+            for name in ["name", "value", "key"]:
+                if name in value:
+                    return str(value[name])
+            return ""
+        return "" if value is None else str(value)
+
+    @staticmethod
+    def __to_number(value) -> float:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return math.nan
+
+    def append(self, issue: dict):
+        fields = issue["fields"]
+        self.keys.append(issue["key"])
+        for name, (field, type) in self.definitions.items():
+            value = fields.get(field)
+            column = self.columns[name]
+            if type == "number":
+                column.append(self.__to_number(value))
+            elif type == "list":
+                self.__append_values(column, [self.__to_string(v) for v in value or []])
+            else:
+                column.append(self.__intern(self.__to_string(value)))
+
+        for name, value in self.extractors.extract(issue).items():
+            self.columns[name].append(self.__intern(value))
+
+        if "link" in self.columns:
+            self.__append_values(
+                self.columns["link"],
+                [link["type"]["name"] for link in fields.get("issuelinks") or []],
+            )
+
+    def extend(self, issues):
+        for issue in issues:
+            self.append(issue)
+
+    def __append_values(self, column, values):
+        codes, offsets = column
+        codes.extend(self.__intern(value) for value in values)
+        offsets.append(len(codes))
+
+    def __get_values(self, name, row) -> list:
+        column = self.columns[name]
+        if isinstance(column, tuple):
+            codes, offsets = column
+            return codes[offsets[row] : offsets[row + 1]]
+        return [column[row]]
+
+    def __get_numbers(self, name):
+        """Returns the number column or the numbers of the values of an extractor with `numbers`."""
+        column = self.columns[name]
+        if isinstance(column, array) and column.typecode == "d":
+            return column
+        if name not in self.extractors.numbers:
+            raise ValueError("Column {} is not a number column".format(name))
+
+        # the number of every interned string, the codes of the column index into it
+        mapping = self.extractors.numbers[name]
+        numbers = array(
+            "d",
+            (
+                mapping[value] if value in mapping else self.__to_number(value)
+                for value in self.strings
+            ),
+        )
+        return array("d", (numbers[code] for code in column))
+
+    def aggregate(self, group_by, sums=()) -> list:
+        """Groups the issues by the values of the given columns and returns a list of dicts holding the values of the
+        group, the `count` of issues and the sum of each number column in `sums` as `sum(<column>)`, the largest
+        groups first. An issue with several values in a list column counts for each of them, an issue without any for
+        none."""
+        for name in list(group_by) + list(sums):
+            if name not in self.columns:
+                raise ValueError("Unknown column {}".format(name))
+        number_columns = [self.__get_numbers(name) for name in sums]
+
+        # tuple of string codes -> [count, sums...]
+        groups = {}
+        for row in range(len(self)):
+            values = [self.__get_values(name, row) for name in group_by]
+            for group in product(*values):
+                totals = groups.get(group)
+                if totals is None:
+                    totals = groups[group] = [0] + [0.0] * len(number_columns)
+                totals[0] += 1
+                for i, column in enumerate(number_columns):
+                    if not math.isnan(column[row]):
+                        totals[i + 1] += column[row]
+
+        rows = []
+        for group, totals in sorted(groups.items(), key=lambda item: -item[1][0]):
+            row = {name: self.strings[code] for name, code in zip(group_by, group)}
+            row["count"] = totals[0]
+            for name, total in zip(sums, totals[1:]):
+                row["sum({})".format(name)] = total
+            rows.append(row)
+        return rows
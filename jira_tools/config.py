@@ -8,8 +8,8 @@ class ConfigAndOptions:
             return json.loads(config_file.read())
 
     # FIXME move to config file? at least the more complex ones
-    def __parse_args(self):
-        parser = argparse.ArgumentParser()
+    def __parse_args(self, args=None, prog=None):
+        parser = argparse.ArgumentParser(prog=prog)
         parser.add_argument(
             "-f",
             "--file-name",
@@ -24,6 +24,41 @@ class ConfigAndOptions:
             default=False,
             help="Render graphviz code to stdout instead of generating an image.",
         )
+        parser.add_argument(
+            "--force-render",
+            action="store_true",
+            dest="force_render",
+            default=False,
+            help="Render the image even if the graph did not change since the last run.",
+        )
+        parser.add_argument(
+            "--format",
+            dest="formats",
+            type=lambda value: value.split(","),
+            default="png",
+            help="comma separated formats to render the graph in (e.g. png,svg), dot keeps the DOT source",
+        )
+        parser.add_argument(
+            "--engine",
+            dest="engine",
+            choices=["dot", "sfdp", "neato", "fdp", "circo", "twopi"],
+            default="dot",
+            help="graphviz layout engine, sfdp is meant for very large graphs",
+        )
+        parser.add_argument(
+            "--render-timeout",
+            dest="render_timeout",
+            type=float,
+            default=None,
+            help="seconds after which rendering is aborted",
+        )
+        parser.add_argument(
+            "--components",
+            dest="components",
+            choices=["none", "clusters", "separate"],
+            default="none",
+            help="split the graph into its connected components, drawn as clusters of one image or as separate images",
+        )
         parser.add_argument(
             "--debug",
             action="store_true",
@@ -41,20 +76,27 @@ class ConfigAndOptions:
             default=[],
             help="Exclude issue keys - can be repeated for multiple issues",
         )
-        # FIXME this was remove from the new code, we always show all directions
         parser.add_argument(
             "-s",
             "--show-directions",
             dest="show_directions",
-            default=["inward", "outward"],
-            help="which directions to show (inward, outward)",
+            default="inward,outward",
+            help="which directions to show, comma separated (inward, outward)",
         )
         parser.add_argument(
             "-d",
             "--directions",
             dest="directions",
-            default=["inward", "outward"],
-            help="which directions to walk (inward, outward)",
+            default="inward,outward",
+            help="which directions to walk, comma separated (inward, outward)",
+        )
+        parser.add_argument(
+            "--max-depth",
+            dest="max_depth",
+            type=int,
+            default=None,
+            help="how many links to follow from the queried issues, 1 (default) only shows their direct links, "
+            "--from-snapshot defaults to the depth of the snapshot",
         )
         parser.add_argument(
             "--jql",
@@ -79,25 +121,124 @@ class ConfigAndOptions:
         parser.add_argument(
             "issues", nargs="*", help="The issue key (e.g. JRADEV-1107, JRADEV-1391)"
         )
+        parser.add_argument(
+            "--client",
+            dest="client",
+            choices=["sync", "async"],
+            default=None,
+            help="JIRA client to use, overrides the client of the config",
+        )
+        parser.add_argument(
+            "--analyze",
+            dest="analyze",
+            action="store_true",
+            default=False,
+            help="highlight dependency cycles and the critical path and write them to <file-name>.analysis.json",
+        )
+        parser.add_argument(
+            "--snapshot",
+            dest="snapshot",
+            default=None,
+            help="write the traversed issues and their links as JSON lines to this file",
+        )
+        parser.add_argument(
+            "--from-snapshot",
+            dest="from_snapshot",
+            default=None,
+            help="take the issues from a file written by --snapshot instead of JIRA, without any HTTP calls",
+        )
+        parser.add_argument(
+            "--profile",
+            dest="profile",
+            action="store_true",
+            default=False,
+            help="print requests, cache hits and durations of the phases to stderr at the end",
+        )
+        parser.add_argument(
+            "--profile-format",
+            dest="profile_format",
+            choices=["table", "json"],
+            default="table",
+            help="format of the --profile report",
+        )
+        parser.add_argument(
+            "--output-format",
+            dest="output_format",
+            choices=["text", "csv", "tsv", "jsonl"],
+            default="text",
+            help="Output format of jira-query.py",
+        )
+        parser.add_argument(
+            "--group-by",
+            dest="group_by",
+            default=None,
+            help="Comma separated columns to count the issues of jira-query.py by instead of printing them",
+        )
+        parser.add_argument(
+            "--sum",
+            dest="sums",
+            default="",
+            help="Comma separated number columns to sum up per group of --group-by",
+        )
+        parser.add_argument(
+            "--jobs-file",
+            dest="jobs_file",
+            default=None,
+            help="Path to JSON file with the graphs to generate in batch mode",
+        )
+        parser.add_argument(
+            "--host",
+            dest="host",
+            default="127.0.0.1",
+            help="Address the server mode listens on",
+        )
+        parser.add_argument(
+            "--port",
+            dest="port",
+            type=int,
+            default=8080,
+            help="Port the server mode listens on",
+        )
         parser.add_argument(
             "--config-file",
             dest="config_file",
             default="",
             help="Path to JSON config file",
         )
-        return parser.parse_args()
+        return parser.parse_args(args)
 
-    def get_config_and_options(self):
-        """Returns the configuration and cli options."""
-        options = self.__parse_args()
+    def get_config_and_options(self, args=None, prog=None):
+        """Returns the configuration and cli options, `args` defaults to the arguments of the command line. `prog` is
+        the name of the program in the usage, defaults to the name of the script."""
+        options = self.__parse_args(args, prog)
 
         # FIXME use json schema and have some docs
         config = self.__load_config(options.config_file)
 
         # map cli params into config
         config["jira"]["issue_excludes"] = options.issue_excludes
-        config["jira"]["show_directions"] = options.show_directions
+        config["jira"]["show_directions"] = options.show_directions.split(",")
+        config["jira"]["directions"] = options.directions.split(",")
+        if options.client is not None:
+            config["jira"]["client"] = options.client
+        if options.analyze:
+            config.setdefault("analysis", {})["enabled"] = True
+        if options.max_depth is None:
+            options.max_depth = self.__get_default_max_depth(options)
+
+        return (self.apply_defaults(config), options)
+
+    def __get_default_max_depth(self, options):
+        if options.from_snapshot is None:
+            return 1
 
+        from jira_tools.snapshot import read_header
+
+        # a snapshot is rendered as deep as it was traversed
+        return read_header(options.from_snapshot)["max_depth"]
+
+    def apply_defaults(self, config):
+        """Adds the defaults for all optional configs and returns the config."""
         # default configs
         if "ignored_statuses" not in config["jira"]:
             config["jira"]["ignored_statuses"] = []
@@ -108,12 +249,86 @@ class ConfigAndOptions:
         if "additional_fields" not in config["jira"]:
             config["jira"]["additional_fields"] = []
 
+        if "client" not in config["jira"]:
+            config["jira"]["client"] = "sync"
+
+        if "max_workers" not in config["jira"]:
+            config["jira"]["max_workers"] = 8
+
+        if "max_requests" not in config["jira"]:
+            config["jira"]["max_requests"] = 50
+
+        if "batch_size" not in config["jira"]:
+            config["jira"]["batch_size"] = 100
+
+        if "page_size" not in config["jira"]:
+            config["jira"]["page_size"] = 100
+
+        # persistent cache config defaults, the cache is only used if a file is given
+        if "cache" not in config["jira"]:
+            config["jira"]["cache"] = {}
+        if "ttl" not in config["jira"]["cache"]:
+            config["jira"]["cache"]["ttl"] = 86400
+
+        # issues held in memory, the least recently used ones are dropped first
+        if "memory_cache" not in config["jira"]:
+            config["jira"]["memory_cache"] = {}
+        if "max_issues" not in config["jira"]["memory_cache"]:
+            config["jira"]["memory_cache"]["max_issues"] = 100000
+        # no expiry for a single run, the server mode sets one
+        if "ttl" not in config["jira"]["memory_cache"]:
+            config["jira"]["memory_cache"]["ttl"] = None
+        if "max_graphs" not in config["jira"]["memory_cache"]:
+            config["jira"]["memory_cache"]["max_graphs"] = 100
+
+        # http config defaults
+        config["jira"]["http"] = {
+            "backoff_factor": 0.5,
+            "pool_size": config["jira"]["max_workers"] + 2,
+            "retries": 3,
+            "timeout": 30,
+        } | config["jira"].get("http", {})
+
         # links config defaults
         if "links" not in config["jira"]:
             config["jira"]["links"] = {}
         if "ignored_statuses" not in config["jira"]["links"]:
             config["jira"]["links"]["ignored_statuses"] = []
 
+        # query config defaults, the estimation is taken from a "h3. Estimation" heading of the description, its sizes
+        # are summed up as numbers
+        if "query" not in config:
+            config["query"] = {}
+        if "extractors" not in config["query"]:
+            config["query"]["extractors"] = {
+                "estimation": {
+                    "field": "description",
+                    "pattern": r"h3. Estimation[\r\n]*(['-SLMX']{1,4})",
+                    "default": "Unknown",
+                    "numbers": {"XS": 1, "S": 2, "M": 3, "L": 5, "XL": 8},
+                }
+            }
+        # columns of the aggregations, the extractors are columns as well
+        if "columns" not in config["query"]:
+            config["query"]["columns"] = {
+                "status": "status",
+                "issuetype": "issuetype",
+                "project": "project",
+                "label": {"field": "labels", "type": "list"},
+                "epic": "parent",
+            }
+
+        # analysis config defaults, the weights map the estimation to numbers
+        config["analysis"] = {
+            "enabled": False,
+            "weight": "estimation",
+            "weights": {"XS": 1, "S": 2, "M": 3, "L": 5, "XL": 8},
+            "default_weight": 1,
+            "edge_labels": [],
+            "cycle_color": "red",
+            "critical_path_color": "blue",
+        } | config.get("analysis", {})
+
         # layout config defaults
         layout_defaults = {
             "boxStyle": "filled",
@@ -137,4 +352,4 @@ class ConfigAndOptions:
                 "wordWrap": True,
             } | config["layout"]["defaults"]
 
-        return (config, options)
+        return config
@@ -0,0 +1,510 @@
+import html
+import json
+import os
+import sys
+import textwrap
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from jira_tools.analysis import GraphAnalysis, get_weights
+from jira_tools.dot import DotWriter, render
+from jira_tools.extract import FieldExtractors
+from jira_tools.graph import Graph
+from jira_tools.logging import Logging
+from jira_tools.profile import profile
+from jira_tools.search import JiraSearch
+from jira_tools.snapshot import SnapshotWriter
+from jira_tools.styles import StyleRules
+from jira_tools.traversal import IssueTraversal
+
+# FIXME move to props
+MAX_SUMMARY_LENGTH = 30
+
+
+class DotGenerator(Logging):
+    def __init__(
+        self,
+        config: dict,
+        options: dict,
+        jira: JiraSearch,
+        issue_keys=None,
+        snapshot: SnapshotWriter = None,
+    ):
+        self.config = config
+        self.options = options
+        self.jira = jira
+        # can be any iterable, e.g. a stream of the keys of a JQL search
+        self.issues_list = self.options.issues if issue_keys is None else issue_keys
+        # optional, records the traversed issues and links
+        self.snapshot = snapshot
+        self.graph = Graph()
+        self.styles = StyleRules(self.config)
+        # issue key -> additional attributes of the node, e.g. the color of a cycle
+        self.node_attributes = {}
+        # edges of inward links, the analysis reverses them
+        self.inward_edges = set()
+
+    @staticmethod
+    def get_fields(config: dict) -> set:
+        """Returns the issue fields needed to draw a node, the summary of the label and those of the style rules. The
+        analysis needs the fields of the extractors for the weights of the nodes."""
+        fields = {"summary"} | StyleRules(config).fields
+        if config["analysis"]["enabled"]:
+            fields |= FieldExtractors(config).fields
+        return fields
+
+    def __create_legend(self):
+        if "legend" not in self.config["layout"]:
+            return ""
+        return 'label=<{}>;fontname="{}";\n'.format(
+            self.config["layout"]["legend"].format(
+                datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+            ),
+            self.config["layout"]["defaults"]["fontName"],
+        )
+
+    def __generate(self, writer: DotWriter = None):
+        """Collects the graph, the statements are written to the writer on the way if one is given."""
+        self.writer = writer
+        # the quoted key and summary identifies a node in dot, it is created once per node
+        self.node_ids = {}
+        traversal = IssueTraversal(
+            self.config,
+            self.options,
+            self.jira,
+            link_filter=self.__is_link_drawn,
+            snapshot=self.snapshot,
+        )
+        with profile.phase("generate"):
+            for issue, _, links in traversal.walk(self.issues_list):
+                self.__add_issue_to_graph(issue, links)
+        profile.count("nodes", len(self.graph.nodes))
+        profile.count("edges", len(self.graph.edges))
+        return len(self.graph.nodes), len(self.graph.edges)
+
+    def __is_link_drawn(self, link):
+        # FIXME move to config
+        # exclude blocks relations which are of type "Blocks" and outward. In contrast the "Blocked by" is also type "Blocks" but inward
+        return not (
+            link["direction"] == "inward" and link["link"]["type"]["name"] in ["Blocks"]
+        )
+
+    def __add_issue_to_graph(self, issue, links):
+        issue_key = issue["key"]
+
+        # add the node for the issue, linked issues of the previous level already have one
+        self.__add_node(issue_key, issue["fields"])
+
+        # FIXME do we need that?
+        # if not ignore_subtasks:
+        #     if fields["issuetype"]["name"] == "Epic" and not ignore_epic:
+        #         issues = jira.query('"Epic Link" = "%s"' % issue_key)
+        #         for subtask in issues:
+        #             subtask_key = get_key(subtask)
+        #             self.log(subtask_key + " => references epic => " + issue_key)
+        #             node = "{}->{}[color=orange]".format(
+        #                 create_node_text(issue_key, fields),
+        #                 create_node_text(subtask_key, subtask["fields"]),
+        #             )
+        #             graph.append(node)
+        #             children.append(subtask_key)
+        #     if "subtasks" in fields and not ignore_subtasks:
+        #         for subtask in fields["subtasks"]:
+        #             subtask_key = get_key(subtask)
+        #             self.log(issue_key + " => has subtask => " + subtask_key)
+        #             node = '{}->{}[color=blue][label="subtask"]'.format(
+        #                 create_node_text(issue_key, fields),
+        #                 create_node_text(subtask_key, subtask["fields"]),
+        #             )
+        #             graph.append(node)
+        #             children.append(subtask_key)
+
+        # add the links of the issue to the graph as well
+        for link in links:
+            self.__handle_issue_link(issue_key, link)
+
+    def __handle_issue_link(self, issue_key, link):
+        # the linked issue is lazy, data the link does not hold (e.g. labels) is fetched when styling needs it
+        linked_issue = link["issue"]
+        linked_issue_key = linked_issue["key"]
+        direction = link["direction"]
+        link_type = link["label"]
+
+        # arrow = " => " if direction == "outward" else " <= "
+        # self.log(issue_key + arrow + link_type + arrow + linked_issue_key)
+
+        attributes = {}
+        # FIXME to be configured
+        if link_type == "blocks":
+            attributes["color"] = "red"
+
+        if direction not in self.config["jira"]["show_directions"]:
+            # FIXME for the children case the linked_issue_key is needed from the caller of this method
+            return
+        else:
+            # add the node first, this does nothing if the issue is contained in the original query and
+            # re-appears now in a link
+            self.__add_node(linked_issue_key, linked_issue["fields"])
+
+            # create the edge between the linked issue and the original one, duplicates are collapsed by the graph
+            edge = (issue_key, linked_issue_key, link_type)
+            if not self.graph.add_edge(*edge, attributes):
+                return
+            if direction == "inward":
+                self.inward_edges.add(edge)
+            if self.writer is not None:
+                self.writer.write(self.__create_edge_statement(edge))
+
+    def __add_node(self, issue_key, issue_fields):
+        # nodes are written as soon as they are added to the graph
+        if self.graph.add_node(issue_key, issue_fields):
+            self.node_ids[issue_key] = self.__create_node_id(issue_key, issue_fields)
+            if self.writer is not None:
+                self.writer.write(self.__create_node_statement(issue_key))
+
+    def __create_node_statement(self, issue_key):
+        return "{} {}".format(
+            self.node_ids[issue_key],
+            self.__get_styles_for_node(issue_key, self.graph.nodes[issue_key]),
+        )
+
+    def __create_edge_statement(self, edge):
+        from_key, to_key, link_type = edge
+        attributes = self.graph.edges[edge]
+        extra = ',fontname="{}"'.format(self.config["layout"]["defaults"]["fontName"])
+        if "color" in attributes:
+            extra += ",color=" + attributes["color"]
+        if "penwidth" in attributes:
+            extra += ",penwidth={}".format(attributes["penwidth"])
+        return '{}->{}[label="{}"{}]'.format(
+            self.node_ids[from_key],
+            self.node_ids[to_key],
+            link_type,
+            extra,
+        )
+
+    def __write_component(self, writer: DotWriter, component: Graph):
+        for issue_key in component.nodes:
+            writer.write(self.__create_node_statement(issue_key))
+        for edge in component.edges:
+            writer.write(self.__create_edge_statement(edge))
+        return len(component.nodes), len(component.edges)
+
+    def __write_clusters(self, writer: DotWriter, components, isolated_keys):
+        for index, component in enumerate(components):
+            writer.begin_subgraph("cluster_{}".format(index))
+            writer.write("color=lightgrey")
+            self.__write_component(writer, component)
+            writer.end_subgraph()
+        self.__write_isolated(writer, isolated_keys)
+        return len(self.graph.nodes), len(self.graph.edges)
+
+    def __write_isolated(self, writer: DotWriter, issue_keys):
+        """Writes the issues without links as rows of a single table node, which takes much less space than a node
+        per issue."""
+        if len(issue_keys) == 0:
+            return 0, 0
+        rows = []
+        for issue_key in issue_keys:
+            issue_fields = self.graph.nodes[issue_key]
+            with profile.phase("styles"):
+                layout = self.styles.get_layout(issue_key, issue_fields)
+            rows.append(
+                '<tr><td bgcolor="{}">{}</td><td align="left">{}</td></tr>'.format(
+                    layout["fillColor"],
+                    html.escape(issue_key),
+                    html.escape(issue_fields["summary"]),
+                )
+            )
+        writer.write(
+            'isolated [shape=plaintext,fontname="{}",label=<<table border="0" cellborder="1" cellspacing="0">'
+            '<tr><td colspan="2"><b>Issues without links</b></td></tr>{}</table>>]'.format(
+                self.config["layout"]["defaults"]["fontName"], "".join(rows)
+            )
+        )
+        return len(issue_keys), 0
+
+    def __get_parts(self, image_file_name) -> dict:
+        """Returns a dict of the file name (without extension) of each image to create to a function writing its
+        statements to a DotWriter and returning the number of nodes and edges."""
+        analyze = self.config["analysis"]["enabled"]
+        if self.options.components == "none" and not analyze:
+            # the dot source is streamed while traversing
+            return {image_file_name: self.__generate}
+
+        # the components and the result of the analysis are only known once the whole graph is collected
+        self.__generate()
+        if analyze:
+            self.__analyze(image_file_name)
+        if self.options.components == "none":
+            return {
+                image_file_name: lambda writer: self.__write_component(
+                    writer, self.graph
+                )
+            }
+
+        components = []
+        isolated_keys = []
+        for component in self.graph.components():
+            if len(component.edges) > 0:
+                components.append(component)
+            else:
+                isolated_keys.extend(component.nodes)
+
+        if self.options.components == "clusters":
+            return {
+                image_file_name: lambda writer: self.__write_clusters(
+                    writer, components, isolated_keys
+                )
+            }
+
+        parts = {
+            "{}-{}".format(image_file_name, index + 1): (
+                lambda writer, component=component: self.__write_component(
+                    writer, component
+                )
+            )
+            for index, component in enumerate(components)
+        }
+        if len(isolated_keys) > 0:
+            parts[image_file_name + "-isolated"] = lambda writer: self.__write_isolated(
+                writer, isolated_keys
+            )
+        return parts
+
+    def __analyze(self, image_file_name):
+        """Highlights the dependency cycles and the critical path of the graph and writes the analysis as
+        `<image_file_name>.analysis.json`."""
+        analysis_config = self.config["analysis"]
+        with profile.phase("analysis"):
+            analysis = GraphAnalysis(
+                self.graph,
+                get_weights(self.graph, self.config),
+                analysis_config["edge_labels"],
+                self.inward_edges,
+            )
+            critical_path = analysis.critical_path()
+            path, path_edges, _ = critical_path
+            # issue key and dependency (from key, to key) -> color, the cycles are drawn over the critical path,
+            # which passes through them
+            node_colors = dict.fromkeys(path, analysis_config["critical_path_color"])
+            edge_colors = dict.fromkeys(
+                path_edges, analysis_config["critical_path_color"]
+            )
+            for cycle in analysis.cycles:
+                for from_key in cycle:
+                    node_colors[from_key] = analysis_config["cycle_color"]
+                    component_id = analysis.component_ids[from_key]
+                    for to_key in analysis.successors[from_key]:
+                        if analysis.component_ids[to_key] == component_id:
+                            edge_colors[from_key, to_key] = analysis_config[
+                                "cycle_color"
+                            ]
+
+            for issue_key, color in node_colors.items():
+                self.node_attributes[issue_key] = {"color": color, "penwidth": 3}
+            for edge, attributes in self.graph.edges.items():
+                color = edge_colors.get(analysis.get_dependency(edge))
+                if color is not None:
+                    attributes["color"] = color
+                    attributes["penwidth"] = 2
+
+            report = analysis.as_dict(critical_path)
+        profile.count("cycles", len(report["cycles"]))
+        self.log(
+            "Found {} cycles, the critical path has {} issues with a weight of {}".format(
+                len(report["cycles"]),
+                len(report["critical_path"]["issues"]),
+                report["critical_path"]["weight"],
+            )
+        )
+        with open(image_file_name + ".analysis.json", "w") as report_file:
+            report_file.write(json.dumps(report, indent=4))
+
+    def __create_node_id(self, issue_key, issue_fields):
+        summary = issue_fields["summary"]
+
+        if self.config["layout"]["defaults"]["wordWrap"]:
+            if len(summary) > MAX_SUMMARY_LENGTH:
+                # split the summary into multiple lines adding a \n to each line
+                summary = textwrap.fill(summary, MAX_SUMMARY_LENGTH)
+        else:
+            # truncate long labels with "...", but only if the three dots are replacing more than two characters
+            # -- otherwise the truncated label would be taking more space than the original.
+            if len(summary) > MAX_SUMMARY_LENGTH + 2:
+                summary = summary[:MAX_SUMMARY_LENGTH] + "..."
+        summary = summary.replace('"', '\\"')
+
+        return '"{}\\n{}"'.format(issue_key, summary)
+
+    def __get_styles_for_node(self, issue_key, issue_fields):
+        with profile.phase("styles"):
+            layout = self.styles.get_layout(issue_key, issue_fields)
+
+        extra = "".join(
+            ',{}="{}"'.format(name, value)
+            for name, value in self.node_attributes.get(issue_key, {}).items()
+        )
+        return '[fillcolor="{}",style="{}",fontname="{}"{}]'.format(
+            layout["fillColor"],
+            layout["boxStyle"],
+            layout["fontName"],
+            extra,
+        )
+
+    def generate_graph(
+        self,
+        image_file_name,
+        print_only=False,
+        keep_dot_file=False,
+        executor=None,
+        formats=("png",),
+    ):
+        """Generates the graph and renders it into `<image_file_name>.<format>` for all formats, the format `dot`
+        keeps the DOT source. If the `components` option is `separate`, each connected component is rendered into
+        `<image_file_name>-<n>.<format>` instead, the largest first, and the issues without links into
+        `<image_file_name>-isolated.<format>`.
+        Returns a list of tuples (image file name, manifest) or, if an executor is given, (image file name, future of
+        the manifest), the rendering runs on the executor then."""
+        node_shape = self.config["layout"]["defaults"]["nodeShape"]
+        start = time.perf_counter()
+        parts = self.__get_parts(image_file_name)
+        if print_only:
+            for write in parts.values():
+                writer = DotWriter(sys.stdout, node_shape)
+                write(writer)
+                writer.close()
+            return []
+
+        # the dot source is written into a file, graphviz renders the image from that file
+        manifests = {}
+        for file_name, write in parts.items():
+            with open(file_name + ".dot", "w") as dot_file:
+                writer = DotWriter(dot_file, node_shape, self.__create_legend())
+                nodes, edges = write(writer)
+                writer.close()
+            manifests[file_name] = {
+                "nodes": nodes,
+                "edges": edges,
+                "generated": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
+                "timings": {},
+                "hash": writer.fingerprint,
+                "engine": self.options.engine,
+                "formats": list(formats),
+            }
+        for manifest in manifests.values():
+            manifest["timings"]["generate"] = round(time.perf_counter() - start, 3)
+
+        calls = [
+            (
+                file_name,
+                (
+                    file_name + ".dot",
+                    file_name,
+                    manifest,
+                    self.options.force_render,
+                    keep_dot_file or "dot" in formats,
+                    self.options.render_timeout,
+                ),
+            )
+            for file_name, manifest in manifests.items()
+        ]
+        if executor is not None:
+            return [
+                (file_name, executor.submit(create_image, *arguments))
+                for file_name, arguments in calls
+            ]
+
+        if len(calls) == 1:
+            results = [
+                (file_name, create_image(*arguments)) for file_name, arguments in calls
+            ]
+        else:
+            # the components are rendered in parallel
+            with ProcessPoolExecutor(
+                max_workers=min(len(calls), os.cpu_count() or 1)
+            ) as pool:
+                futures = [
+                    (file_name, pool.submit(create_image, *arguments))
+                    for file_name, arguments in calls
+                ]
+                results = [
+                    (file_name, future.result()) for file_name, future in futures
+                ]
+
+        for file_name, manifest in results:
+            self.log_rendering(file_name, manifest)
+        return results
+
+    def log_rendering(self, image_file_name, manifest):
+        if manifest["rendered"]:
+            profile.add_duration("render", manifest["timings"]["render"])
+            self.log(
+                "Rendered {} as {}".format(
+                    image_file_name, ", ".join(manifest["formats"])
+                )
+            )
+        elif set(manifest["formats"]) == {"dot"}:
+            self.log("Wrote the DOT source of {}".format(image_file_name))
+        else:
+            self.log(
+                "Skipping rendering of {}, the graph did not change since the last run".format(
+                    image_file_name
+                )
+            )
+
+
+def create_image(
+    dot_file_name,
+    image_file_name,
+    manifest,
+    force_render=False,
+    keep_dot_file=False,
+    timeout=None,
+):
+    """Renders the DOT file into `<image_file_name>.<format>` for the formats and with the engine of the manifest,
+    unless the graph did not change since the last run, and writes the manifest next to it. Returns the manifest.
+    This runs in worker processes of the batch mode as well, so it gets everything it needs as arguments."""
+    manifest_file_name = image_file_name + ".manifest.json"
+    # the DOT source is kept instead of being rendered
+    outputs = {
+        format: image_file_name + "." + format
+        for format in manifest["formats"]
+        if format != "dot"
+    }
+    previous_manifest = load_manifest(manifest_file_name)
+    if len(outputs) == 0:
+        # only the DOT source is kept, the layout engine is not needed
+        manifest["rendered"] = False
+    elif (
+        not force_render
+        and all(os.path.exists(file_name) for file_name in outputs.values())
+        and previous_manifest.get("hash") == manifest["hash"]
+        and previous_manifest.get("engine") == manifest["engine"]
+    ):
+        manifest["rendered"] = False
+    else:
+        start = time.perf_counter()
+        render(dot_file_name, outputs, manifest["engine"], timeout)
+        manifest["timings"]["render"] = round(time.perf_counter() - start, 3)
+        manifest["rendered"] = True
+
+    write_manifest(manifest_file_name, manifest)
+
+    if not keep_dot_file:
+        os.remove(dot_file_name)
+
+    return manifest
+
+
+def load_manifest(manifest_file_name):
+    if not os.path.exists(manifest_file_name):
+        return {}
+    with open(manifest_file_name) as manifest_file:
+        return json.loads(manifest_file.read())
+
+
+def write_manifest(manifest_file_name, manifest):
+    with open(manifest_file_name, "w") as manifest_file:
+        manifest_file.write(json.dumps(manifest, indent=4))
@@ -0,0 +1,46 @@
+import hashlib
+import subprocess
+
+
+class DotWriter:
+    """Writes a digraph statement by statement to a text file object, so the DOT source of a graph is never held in
+    memory as a whole. A fingerprint of all statements, without the legend, is calculated on the way."""
+
+    def __init__(self, file, node_shape, legend=""):
+        self.file = file
+        self.__hash = hashlib.sha256()
+        self.file.write("digraph{\n")
+        # the legend contains the generation time, therefore it is not part of the fingerprint
+        self.file.write(legend)
+        self.write("node [shape={}]".format(node_shape))
+
+    def write(self, statement):
+        self.__write_line(statement + ";\n")
+
+    def begin_subgraph(self, name):
+        self.__write_line("subgraph {} {{\n".format(name))
+
+    def end_subgraph(self):
+        self.__write_line("}\n")
+
+    def __write_line(self, line):
+        self.__hash.update(line.encode("utf-8"))
+        self.file.write(line)
+
+    def close(self):
+        self.file.write("}\n")
+        self.file.flush()
+
+    @property
+    def fingerprint(self):
+        return self.__hash.hexdigest()
+
+
+def render(dot_file_name, outputs: dict, engine="dot", timeout=None):
+    """Renders the DOT file into the outputs, a dict of format (e.g. png, svg) to file name, by calling the graphviz
+    binary of the layout engine, which reads the file on its own. All formats are rendered by one call, so the layout
+    is only calculated once. Raises subprocess.TimeoutExpired if rendering takes longer than `timeout` seconds."""
+    arguments = [engine]
+    for format, file_name in outputs.items():
+        arguments += ["-T" + format, "-o", file_name]
+    subprocess.run(arguments + [dot_file_name], check=True, timeout=timeout)
@@ -0,0 +1,63 @@
+import re
+
+from jira_tools.lru import LruCache
+
+
+class FieldExtractors:
+    """The `query`.`extractors` of the config, named values taken from text fields of an issue with a regular
+    expression. The patterns are compiled once and the values of an issue are extracted once, they are kept until
+    the text of a source field changes."""
+
+    def __init__(self, config: dict, memoize=True, names=None):
+        """`names` limits the extractors to the given ones, all are used if it is None."""
+        extractors = {
+            name: extractor
+            for name, extractor in config["query"]["extractors"].items()
+            if names is None or name in names
+        }
+        # name -> tuple (source field, compiled pattern, default value)
+        self.extractors = {
+            name: (
+                extractor["field"],
+                re.compile(extractor["pattern"], re.MULTILINE),
+                extractor.get("default", ""),
+            )
+            for name, extractor in extractors.items()
+        }
+        self.names = list(self.extractors)
+        # name -> dict of value to number of the extractors that can be summed up, other values are taken as number
+        self.numbers = {
+            name: extractor["numbers"]
+            for name, extractor in extractors.items()
+            if "numbers" in extractor
+        }
+        # the issue fields the extractors look at, they have to be fetched for every issue
+        self.fields = {field for field, _, _ in self.extractors.values()}
+        # issue key -> tuple (texts of the source fields, dict of name -> value), without memoizing the texts are not
+        # kept in memory
+        self.__values = None
+        if memoize:
+            self.__values = LruCache(config["jira"]["memory_cache"]["max_issues"])
+
+    def extract(self, issue: dict) -> dict:
+        """Returns a dict of extractor name to the value for the issue, the default if the pattern does not match."""
+        issue_fields = issue["fields"]
+        texts = tuple(
+            issue_fields.get(field) for field, _, _ in self.extractors.values()
+        )
+        entry = None if self.__values is None else self.__values.get(issue["key"])
+        # the texts are usually the same objects, so comparing them is cheap
+        if entry is not None and entry[0] == texts:
+            return entry[1]
+
+        values = {}
+        for (name, (_, pattern, default)), text in zip(self.extractors.items(), texts):
+            # fields can be empty, e.g. issues without description
+            match = pattern.search(text) if isinstance(text, str) else None
+            if match is None:
+                values[name] = default
+            else:
+                values[name] = match.group(1) if pattern.groups > 0 else match.group(0)
+        if self.__values is not None:
+            self.__values.put(issue["key"], (texts, values))
+        return values
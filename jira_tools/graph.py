@@ -0,0 +1,55 @@
+class Graph:
+    """In-memory model of a dependency graph. Nodes are stored by issue key, edges by the tuple
+    (from key, to key, label), both in insertion order. Adding a node or edge twice keeps the first one."""
+
+    def __init__(self):
+        # issue key -> fields of the issue
+        self.nodes = {}
+        # (from key, to key, label) -> dict of additional attributes, e.g. color
+        self.edges = {}
+
+    def __contains__(self, issue_key):
+        return issue_key in self.nodes
+
+    def add_node(self, issue_key, issue_fields) -> bool:
+        """Adds the node, returns False if it already existed."""
+        if issue_key in self.nodes:
+            return False
+        self.nodes[issue_key] = issue_fields
+        return True
+
+    def add_edge(self, from_key, to_key, label, attributes=None) -> bool:
+        """Adds the edge between two existing nodes, returns False if it already existed."""
+        edge = (from_key, to_key, label)
+        if edge in self.edges:
+            return False
+        self.edges[edge] = {} if attributes is None else attributes
+        return True
+
+    def components(self) -> list:
+        """Returns the weakly connected components as graphs, the largest first. Nodes and edges keep their order."""
+        # union find, every node points to its parent until the root representing the component
+        parents = {issue_key: issue_key for issue_key in self.nodes}
+
+        def find(issue_key):
+            while parents[issue_key] != issue_key:
+                parents[issue_key] = parents[parents[issue_key]]
+                issue_key = parents[issue_key]
+            return issue_key
+
+        for from_key, to_key, _ in self.edges:
+            parents[find(from_key)] = find(to_key)
+
+        components = {}
+        for issue_key, issue_fields in self.nodes.items():
+            components.setdefault(find(issue_key), Graph()).add_node(
+                issue_key, issue_fields
+            )
+        for edge, attributes in self.edges.items():
+            components[find(edge[0])].add_edge(*edge, attributes)
+
+        return sorted(
+            components.values(),
+            key=lambda component: len(component.nodes),
+            reverse=True,
+        )
@@ -1,13 +1,8 @@
-from functools import reduce
+from itertools import islice
 
 
-def filter_duplicates(lst):
-    if len(lst) == 0:
-        return lst
-
-    # Enumerate the list to restore order lately; reduce the sorted list; restore order
-    def append_unique(acc, item):
-        return acc if acc[-1][1] == item[1] else acc.append(item) or acc
-
-    srt_enum = sorted(enumerate(lst), key=lambda i_val: i_val[1])
-    return [item[1] for item in sorted(reduce(append_unique, srt_enum, [srt_enum[0]]))]
+def chunks(iterable, size):
+    """Splits the given iterable lazily into lists of the given size, the last one may be shorter."""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
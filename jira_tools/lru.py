@@ -0,0 +1,54 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LruCache:
+    """Thread-safe mapping holding at most `max_size` entries, the least recently used ones are evicted first.
+    Entries older than `ttl` seconds are dropped when they are accessed. A `max_size` or `ttl` of 0 or None means no limit.
+    The optional `on_evict` is called with the key and the value of each entry dropped for the size or the `ttl`,
+    outside of the lock."""
+
+    def __init__(self, max_size=0, ttl=0, on_evict=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self.__lock = threading.Lock()
+        # key -> tuple (time of storing, value), the most recently used last
+        self.__entries = OrderedDict()
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def get(self, key, default=None):
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                return default
+            if not self.ttl or time.monotonic() - entry[0] <= self.ttl:
+                self.__entries.move_to_end(key)
+                return entry[1]
+            del self.__entries[key]
+        if self.on_evict is not None:
+            self.on_evict(key, entry[1])
+        return default
+
+    def put(self, key, value):
+        evicted = []
+        with self.__lock:
+            self.__entries[key] = (time.monotonic(), value)
+            self.__entries.move_to_end(key)
+            while self.max_size > 0 and len(self.__entries) > self.max_size:
+                evicted.append(self.__entries.popitem(last=False))
+        if self.on_evict is not None:
+            for evicted_key, (_, evicted_value) in evicted:
+                self.on_evict(evicted_key, evicted_value)
+
+    def pop(self, key, default=None):
+        with self.__lock:
+            entry = self.__entries.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
@@ -0,0 +1,126 @@
+import json
+import sys
+import threading
+import time
+from bisect import bisect_left
+
+
+class Phase:
+    """Context manager adding its duration to a phase of the profile."""
+
+    def __init__(self, profile, name):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profile.add_duration(self.name, time.perf_counter() - self.start)
+
+
+class Profile:
+    """Collects counters, the latency histogram of the requests and the durations of the phases of a run. Nothing is
+    recorded unless `enabled` is set, which the `--profile` option does. Phases can be nested, e.g. fetching linked
+    issues while styling them, so their durations do not add up to the wall time."""
+
+    # upper bounds of the latency buckets in seconds, the last bucket takes all slower requests
+    latency_buckets = [0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+
+    def __init__(self):
+        self.enabled = False
+        self.__lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.start = time.perf_counter()
+        # name -> value
+        self.counters = {}
+        # name -> [calls, seconds]
+        self.phases = {}
+        self.latencies = [0] * (len(self.latency_buckets) + 1)
+
+    def count(self, name, value=1):
+        if not self.enabled:
+            return
+        with self.__lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def add_duration(self, name, seconds):
+        if not self.enabled:
+            return
+        with self.__lock:
+            phase = self.phases.setdefault(name, [0, 0.0])
+            phase[0] += 1
+            phase[1] += seconds
+
+    def phase(self, name) -> Phase:
+        return Phase(self, name)
+
+    def record_request(self, seconds, size, ok):
+        """Records a finished HTTP request with its duration and the size of the response body."""
+        if not self.enabled:
+            return
+        with self.__lock:
+            self.latencies[bisect_left(self.latency_buckets, seconds)] += 1
+        self.count("requests")
+        self.count("bytes", size)
+        if not ok:
+            self.count("failed requests")
+        self.add_duration("requests", seconds)
+
+    def as_dict(self) -> dict:
+        hits = self.counters.get("cache memory hits", 0) + self.counters.get(
+            "cache persistent hits", 0
+        )
+        lookups = hits + self.counters.get("cache misses", 0)
+        bounds = ["<={}s".format(bound) for bound in self.latency_buckets]
+        return {
+            "wall time": round(time.perf_counter() - self.start, 3),
+            "counters": dict(sorted(self.counters.items())),
+            "cache hit ratio": round(hits / lookups, 3) if lookups > 0 else None,
+            "latencies": dict(
+                zip(
+                    bounds + [">{}s".format(self.latency_buckets[-1])],
+                    self.latencies,
+                )
+            ),
+            "phases": {
+                name: {"calls": calls, "seconds": round(seconds, 3)}
+                for name, (calls, seconds) in sorted(self.phases.items())
+            },
+        }
+
+    def report(self, format="table", file=sys.stderr):
+        """Prints the collected data as table or as JSON."""
+        data = self.as_dict()
+        if format == "json":
+            print(json.dumps(data, indent=4), file=file)
+            return
+
+        print("{: <28} {:>10}".format("wall time", data["wall time"]), file=file)
+        print(
+            "{: <28} {:>10}".format("cache hit ratio", str(data["cache hit ratio"])),
+            file=file,
+        )
+        print("", file=file)
+        for name, value in data["counters"].items():
+            print("{: <28} {:>10}".format(name, value), file=file)
+        print("", file=file)
+        print("{: <28} {:>10} {:>10}".format("phase", "calls", "seconds"), file=file)
+        for name, phase in data["phases"].items():
+            print(
+                "{: <28} {:>10} {:>10.3f}".format(
+                    name, phase["calls"], phase["seconds"]
+                ),
+                file=file,
+            )
+        print("", file=file)
+        print("{: <28} {:>10}".format("request latency", "requests"), file=file)
+        for bound, requests in data["latencies"].items():
+            print("{: <28} {:>10}".format(bound, requests), file=file)
+
+
+# shared by all parts of a run
+profile = Profile()
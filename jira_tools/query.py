@@ -0,0 +1,121 @@
+import sys
+
+from jira_tools.extract import FieldExtractors
+from jira_tools.logging import Logging
+from jira_tools.profile import profile
+from jira_tools.search import JiraSearch
+from jira_tools.snapshot import SnapshotWriter
+from jira_tools.table import TableWriter
+from jira_tools.traversal import IssueTraversal
+
+# FIXME move to props
+MAX_SUMMARY_LENGTH = 30
+
+
+class JiraTraversal(Logging):
+    # the issue fields needed to print an issue, the extractors add their source fields
+    FIELDS = ["summary", "status"]
+
+    # columns of the tabular output formats, the values of the extractors are added
+    COLUMNS = ["depth", "parent", "link", "key", "summary", "status"]
+
+    def __init__(
+        self,
+        config: dict,
+        options: dict,
+        jira: JiraSearch,
+        file=None,
+        extractors: FieldExtractors = None,
+        snapshot: SnapshotWriter = None,
+    ):
+        # FIXME init can be extracted
+        self.config = config
+        self.options = options
+        self.jira = jira
+        # text file object the issues are printed to, stdout is looked up now, so redirect_stdout applies
+        self.file = sys.stdout if file is None else file
+        # can be shared, so the values of an issue are only extracted once
+        self.extractors = FieldExtractors(config) if extractors is None else extractors
+        # optional, records the traversed issues and links
+        self.snapshot = snapshot
+        # keys of all printed issues, expanded and linked ones
+        self.issue_keys = set()
+        self.table = None
+        if self.options.output_format != "text":
+            self.table = TableWriter(
+                self.file,
+                self.options.output_format,
+                self.COLUMNS + self.extractors.names,
+            )
+
+    @staticmethod
+    def get_fields(config: dict) -> set:
+        """Returns the issue fields needed to print an issue."""
+        return set(JiraTraversal.FIELDS) | FieldExtractors(config).fields
+
+    def print_issues(self, issue_keys):
+        traversal = IssueTraversal(
+            self.config, self.options, self.jira, snapshot=self.snapshot
+        )
+        with profile.phase("print"):
+            self.__print_issues(traversal.walk(issue_keys))
+            if self.table is not None:
+                self.table.close()
+
+    def __print_issues(self, issues):
+        for issue, depth, links in issues:
+            self.issue_keys.add(issue["key"])
+            if self.table is None:
+                # issues of deeper levels are indented below the issue they are linked to
+                indent = "  " * depth
+                summary = issue["fields"]["summary"]
+                print(f"{indent}{issue['key']}: {summary}", file=self.file)
+            else:
+                self.table.write(self.__create_row(issue, depth))
+
+            for link in links:
+                self.__handle_link(issue, link, depth)
+
+    def print_issue(self, issue_key):
+        self.print_issues([issue_key])
+
+    def __create_row(self, issue, depth, parent="", link=""):
+        fields = issue["fields"]
+        return {
+            "depth": depth,
+            "parent": parent,
+            "link": link,
+            "key": issue["key"],
+            "summary": fields["summary"],
+            "status": fields["status"]["name"],
+        } | self.extractors.extract(issue)
+
+    def __handle_link(self, issue, link, depth):
+        # FIXME copied
+        if link["direction"] not in self.config["jira"]["show_directions"]:
+            # FIXME for the children case the linked_issue_key is needed from the caller of this method
+            return
+
+        # the linked issue is lazy, fields of the extractors like the description are fetched on access as links do
+        # not hold them
+        linked_issue = link["issue"]
+        self.issue_keys.add(linked_issue["key"])
+        if self.table is not None:
+            self.table.write(
+                self.__create_row(linked_issue, depth, issue["key"], link["label"])
+            )
+            return
+
+        indent = "  " * depth
+        linked_issue_key = linked_issue["key"]
+        summary = linked_issue["fields"]["summary"]
+        values = " ".join(
+            f"{value: <{10}}"
+            for value in self.extractors.extract(linked_issue).values()
+        )
+        status = linked_issue["fields"]["status"]["name"]
+        # FIXME configurable
+        print(
+            f"{indent}{linked_issue_key:}: {summary: <{110}} {values} {status}",
+            file=self.file,
+        )
@@ -1,7 +1,17 @@
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+from jira_tools.cache import IssueCache
+from jira_tools.list import chunks
 from jira_tools.logging import Logging
+from jira_tools.lru import LruCache
+from jira_tools.profile import profile
+from jira_tools.view import get_linked_keys
 
 
 class JiraSearch(Logging):
@@ -9,64 +19,431 @@ class JiraSearch(Logging):
     saves us having to pass a bunch of parameters all over the place all the time."""
 
     __base_url = None
-    __issues = {}
 
-    def __init__(self, config: dict, options: dict):
+    # fields fetched if the tool does not give its own profile
+    default_fields = frozenset(
+        ["summary", "status", "description", "issuetype", "subtasks", "labels"]
+    )
+
+    def __init__(self, config: dict, options: dict, fields=None):
+        """`fields` is the profile of the tool, the fields it needs to render an issue. Only these are fetched for
+        linked issues that are not expanded, expanded issues additionally get the status and their links."""
         self.config = config
         self.options = options
+        # issue key -> tuple (issue, frozenset of the fields the issue was fetched with)
+        self.__issues = LruCache(
+            self.config["jira"]["memory_cache"]["max_issues"],
+            self.config["jira"]["memory_cache"]["ttl"],
+            lambda key, entry: self.__unindex(key, entry[0]),
+        )
         self.url = self.config["jira"]["url"] + "/rest/api/latest"
-        self.fields = ",".join(
-            [
-                "key",
-                "summary",
-                "status",
-                "description",
-                "issuetype",
-                "issuelinks",
-                "subtasks",
-                "labels",
-            ]
-            + self.config["jira"]["additional_fields"]
+        self.max_workers = self.config["jira"]["max_workers"]
+        self.batch_size = self.config["jira"]["batch_size"]
+        self.page_size = self.config["jira"]["page_size"]
+        # issue id -> issue key, JIRA webhooks of links only name the ids of the linked issues
+        self.__keys_by_id = {}
+        # issue key -> set of the keys of the issues whose links embed a stub of it, the stubs hold the summary and
+        # status of the linked issue and are outdated when it changes. Both only index the issues held in memory.
+        self.__linking_keys = {}
+        # issue keys that could not be fetched with the reason, e.g. "404 Not Found"
+        self.unavailable_issues = {}
+        self.timeout = self.config["jira"]["http"]["timeout"]
+        self.session = self.__create_session()
+        self.link_fields = frozenset(
+            self.default_fields if fields is None else fields
+        ) | frozenset(self.config["jira"]["additional_fields"])
+        self.fields = self.link_fields | frozenset(["status", "issuelinks"])
+
+        # optional persistent cache, shared between runs
+        self.cache = None
+        if "file" in self.config["jira"]["cache"]:
+            self.cache = IssueCache(
+                self.config["jira"]["cache"]["file"],
+                self.config["jira"]["cache"]["ttl"],
+            )
+            self.revalidate_cache()
+
+    def revalidate_cache(self):
+        """Drops all cached issues that were updated in JIRA since the last run, using a single JQL search, and the
+        issues linking to them. This is done when the client is created, long running processes call it regularly."""
+        now = time.time()
+        last_run = self.cache.get_last_run()
+        self.cache.purge_expired()
+
+        if last_run is not None:
+            # the remaining entries are younger than the TTL, so changes before that are not of interest.
+            # JQL supports relative dates which avoids any time zone trouble, add a minute as safety margin
+            minutes = int(min(now - last_run, self.cache.ttl) / 60) + 1
+            query = 'updated >= "-{}m"'.format(minutes)
+            if len(self.config["jira"].get("allowed_project_keys", [])) > 0:
+                query += " AND project in ({})".format(
+                    ",".join(self.config["jira"]["allowed_project_keys"])
+                )
+            updated_keys = list(self.list_ids(query))
+            self.log(
+                "Invalidating {} updated issues in cache".format(len(updated_keys))
+            )
+            self.invalidate(updated_keys)
+
+        self.cache.set_last_run(now)
+
+    def get_key(self, issue_id):
+        """Returns the key of an issue fetched before by its id or None."""
+        return self.__keys_by_id.get(str(issue_id))
+
+    def invalidate(self, keys):
+        """Drops the given issue keys from memory and the persistent cache, they are fetched again when needed.
+        Issues that were unavailable are tried again as well. Issues linking to one of the keys are dropped too, as
+        the stubs embedded in their links are outdated."""
+        keys = dict.fromkeys(keys)
+        linking_keys = set()
+        for key in keys:
+            linking_keys |= self.__linking_keys.pop(key, set())
+        if self.cache is not None:
+            linking_keys |= self.cache.get_linking_keys(keys)
+        keys = list(keys) + sorted(linking_keys - keys.keys())
+        for key in keys:
+            entry = self.__issues.pop(key)
+            if entry is not None:
+                self.__unindex(key, entry[0])
+            self.unavailable_issues.pop(key, None)
+        if self.cache is not None:
+            self.cache.invalidate(keys)
+
+    def patch_issue(self, issue: dict) -> bool:
+        """Replaces the cached issue by the given one, e.g. of a webhook event, which holds all fields of the issue.
+        Only the fields the cached issue was fetched with are taken over. If the issue is not held in memory or a
+        field is missing, the issue is only invalidated and False is returned."""
+        key = issue["key"]
+        entry = self.__issues.get(key)
+        if entry is None or not entry[1] <= issue.get("fields", {}).keys():
+            self.invalidate([key])
+            return False
+
+        fields = entry[1]
+        patched = {name: value for name, value in issue.items() if name != "fields"}
+        patched["fields"] = {name: issue["fields"][name] for name in fields}
+        # entries of other field sets in the persistent cache are outdated now
+        self.invalidate([key])
+        self.__cache_issues({key: patched}, fields)
+        return True
+
+    def __cache_issues(self, issues: dict, fields):
+        for key, issue in issues.items():
+            self.__put(key, issue, fields)
+        if self.cache is not None:
+            self.cache.put_many(issues, fields)
+
+    def __put(self, key, issue, fields):
+        """Holds the issue in memory and indexes its id and links."""
+        previous = self.__issues.pop(key)
+        if previous is not None:
+            self.__unindex(key, previous[0])
+        self.__issues.put(key, (issue, fields))
+        if "id" in issue:
+            self.__keys_by_id[issue["id"]] = key
+        for linked_key in get_linked_keys(issue):
+            self.__linking_keys.setdefault(linked_key, set()).add(key)
+
+    def __unindex(self, key, issue):
+        """Removes the id and the links of an issue dropped from memory from the indexes."""
+        if self.__keys_by_id.get(issue.get("id")) == key:
+            del self.__keys_by_id[issue["id"]]
+        for linked_key in get_linked_keys(issue):
+            linking_keys = self.__linking_keys.get(linked_key)
+            if linking_keys is not None:
+                linking_keys.discard(key)
+                if len(linking_keys) == 0:
+                    del self.__linking_keys[linked_key]
+
+    def __get_cached(self, key, fields):
+        """Returns the issue from memory if it holds the given fields, otherwise None."""
+        entry = self.__issues.get(key)
+        if entry is not None and fields <= entry[1]:
+            return entry[0]
+        return None
+
+    def __get_cached_fields(self, key):
+        entry = self.__issues.get(key)
+        return frozenset() if entry is None else entry[1]
+
+    def __load_from_cache(self, keys, fields) -> dict:
+        """Takes the issues holding the given fields from the persistent cache into memory and returns them."""
+        issues = {}
+        for key, (issue, entry_fields) in self.cache.get_many(keys, fields).items():
+            self.__put(key, issue, entry_fields)
+            issues[key] = issue
+        return issues
+
+    def __create_session(self):
+        """Creates the session shared by all requests, so connections are kept alive and reused."""
+        http_config = self.config["jira"]["http"]
+        retry = Retry(
+            total=http_config["retries"],
+            backoff_factor=http_config["backoff_factor"],
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET"],
+            # the waiting time JIRA asks for on 429 and 503 is used instead of the backoff
+            respect_retry_after_header=True,
+            # hand the last response to the caller, raise_for_status takes care of it
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=http_config["pool_size"],
+            pool_maxsize=http_config["pool_size"],
+            max_retries=retry,
         )
 
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.verify = True
+        session.headers.update(
+            {
+                "Content-Type": "application/json",
+                "Authorization": "Bearer {}".format(os.environ["JIRA_ACCESS_TOKEN"]),
+            }
+        )
+        return session
+
     def get(self, uri, params={}):
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": "Bearer {}".format(os.environ["JIRA_ACCESS_TOKEN"]),
-        }
         url = self.url + uri
-        return requests.get(url, params=params, headers=headers, verify=True)
+        start = time.perf_counter()
+        response = self.session.get(url, params=params, timeout=self.timeout)
+        profile.record_request(
+            time.perf_counter() - start, len(response.content), response.ok
+        )
+        return response
 
-    def get_issue(self, key):
-        if key not in self.__issues:
-            """Given an issue key (i.e. JRA-9) return the JSON representation of it. This is the only place where we deal
-            with JIRA's REST API."""
-            # log("Fetching " + key)
-            # we need to expand subtasks and links since that's what we care about here.
-            response = self.get("/issue/%s" % key, params={"fields": self.fields})
-            response.raise_for_status()
+    def get_all(self, calls) -> list:
+        """Runs all given calls, tuples of uri and params, in parallel limited by the `max_workers` config and
+        returns the responses in the same order."""
+        if len(calls) <= 1:
+            return [self.get(uri, params) for uri, params in calls]
 
-            # FIXME could also persist to a file if a config says so
-            # print("#" * 100)
-            # print(response.text)
-            # print("#" * 100)
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(calls))
+        ) as executor:
+            return list(executor.map(lambda call: self.get(*call), calls))
 
-            self.__issues[key] = response.json()
+    def get_issue(self, key, fields=None):
+        """Given an issue key (i.e. JRA-9) return the JSON representation of it, holding at least the given fields
+        (default: `fields`). Returns None if the issue was reported as missing or forbidden by a previous batch
+        fetch."""
+        if key in self.unavailable_issues:
+            return None
+        fields = self.fields if fields is None else frozenset(fields)
 
-        return self.__issues[key]
+        issue = self.__get_cached(key, fields)
+        if issue is not None:
+            profile.count("cache memory hits")
+            return issue
 
-    def query(self, query):
-        self.log("Querying " + query)
-        response = self.get("/search", params={"jql": query, "fields": self.fields})
-        content = response.json()
-        return content["issues"]
+        if self.cache is not None:
+            issue = self.__load_from_cache([key], fields).get(key)
+            if issue is not None:
+                profile.count("cache persistent hits")
+                return issue
 
-    def list_ids(self, query):
+        profile.count("cache misses")
+        # an issue cached with other fields is upgraded, so it keeps the fields it already has
+        fields |= self.__get_cached_fields(key)
+        # log("Fetching " + key)
+        response = self.get(
+            "/issue/%s" % key, params={"fields": ",".join(sorted(fields))}
+        )
+        response.raise_for_status()
+
+        # print("#" * 100)
+        # print(response.text)
+        # print("#" * 100)
+
+        issue = response.json()
+        self.__cache_issues({key: issue}, fields)
+
+        return issue
+
+    def get_issues(self, keys, fields=None):
+        """Fetches all given issue keys that are not cached yet with at least the given fields (default: `fields`)
+        and returns a dict of key to issue.
+        The keys are fetched in chunks of `batch_size` with one search request each, the chunks run in parallel
+        limited by the `max_workers` config. Missing or forbidden issues are not part of the result, they are
+        collected in `unavailable_issues` instead."""
+        fields = self.fields if fields is None else frozenset(fields)
+        keys = list(keys)
+        requested = [
+            key for key in dict.fromkeys(keys) if key not in self.unavailable_issues
+        ]
+        # the result is collected on the way, so entries evicted from memory in the meantime are part of it
+        result = {}
+        missing = []
+        for key in requested:
+            issue = self.__get_cached(key, fields)
+            if issue is None:
+                missing.append(key)
+            else:
+                result[key] = issue
+        profile.count("cache memory hits", len(result))
+        if len(missing) > 0 and self.cache is not None:
+            loaded = self.__load_from_cache(missing, fields)
+            result.update(loaded)
+            missing = [key for key in missing if key not in loaded]
+            profile.count("cache persistent hits", len(loaded))
+        profile.count("cache misses", len(missing))
+
+        # issues cached with other fields are upgraded, keys with the same resulting fields share their batches
+        groups = {}
+        for key in missing:
+            groups.setdefault(fields | self.__get_cached_fields(key), []).append(key)
+        batches = [
+            (batch_fields, batch)
+            for batch_fields, group in groups.items()
+            for batch in chunks(group, self.batch_size)
+        ]
+        if len(batches) > 0:
+            self.log(
+                "Fetching {} issues in {} batches".format(len(missing), len(batches))
+            )
+            found = {}
+            responses = self.get_all(
+                [
+                    ("/search", self.__get_batch_params(batch, batch_fields))
+                    for batch_fields, batch in batches
+                ]
+            )
+            for (batch_fields, batch), response in zip(batches, responses):
+                if response.ok:
+                    issues = {
+                        issue["key"]: issue for issue in response.json()["issues"]
+                    }
+                    self.__cache_issues(issues, batch_fields)
+                    found.update(issues)
+                else:
+                    self.log(
+                        "Batch of {} issues failed with {}, fetching them one by one".format(
+                            len(batch), response.status_code
+                        )
+                    )
+
+            result.update(found)
+
+            # keys that are not part of the result are missing, forbidden or were moved to another key,
+            # the single fetch tells which one it is
+            result.update(
+                self.__fetch_singles(
+                    [key for key in missing if key not in found], fields
+                )
+            )
+
+        return {key: result[key] for key in requested if key in result}
+
+    def __get_batch_params(self, keys, fields):
+        return {
+            "jql": "key in ({})".format(",".join('"{}"'.format(key) for key in keys)),
+            "fields": ",".join(sorted(fields)),
+            "maxResults": len(keys),
+            # report unknown keys as warnings instead of failing the whole query
+            "validateQuery": "warn",
+        }
+
+    def __fetch_singles(self, keys, fields) -> dict:
+        keys_fields = [(key, fields | self.__get_cached_fields(key)) for key in keys]
+        responses = self.get_all(
+            [
+                ("/issue/%s" % key, {"fields": ",".join(sorted(key_fields))})
+                for key, key_fields in keys_fields
+            ]
+        )
+        found = {}
+        for (key, key_fields), response in zip(keys_fields, responses):
+            if response.ok:
+                found[key] = response.json()
+                self.__cache_issues({key: found[key]}, key_fields)
+            else:
+                self.unavailable_issues[key] = "{} {}".format(
+                    response.status_code, response.reason
+                )
+                self.log(
+                    "Skipping {} - unavailable ({})".format(
+                        key, self.unavailable_issues[key]
+                    )
+                )
+        return found
+
+    def search_pages(self, query, fields=None, page_size=None):
+        """Generator running the JQL query and yielding the found issues page by page. The next page is already
+        fetched while the caller handles the current one."""
+        fields = ",".join(sorted(self.fields if fields is None else fields))
+        page_size = self.page_size if page_size is None else page_size
         self.log("Querying " + query)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            page = executor.submit(self.__search_page, query, fields, 0, page_size)
+            while page is not None:
+                content = page.result()
+                issues = content["issues"]
+                start_at = content["startAt"] + len(issues)
+
+                page = None
+                if len(issues) > 0 and start_at < content["total"]:
+                    page = executor.submit(
+                        self.__search_page, query, fields, start_at, page_size
+                    )
+
+                yield issues
+
+    def __search_page(self, query, fields, start_at, max_results):
         response = self.get(
-            "/search", params={"jql": query, "fields": "key", "maxResults": 100}
+            "/search",
+            params={
+                "jql": query,
+                "fields": fields,
+                "startAt": start_at,
+                "maxResults": max_results,
+            },
         )
-        return [issue["key"] for issue in response.json()["issues"]]
+        response.raise_for_status()
+        return response.json()
+
+    def query(self, query, page_size=None):
+        """Generator yielding all issues of the JQL query, the issues are cached so they are not fetched again."""
+        if self.cache is not None:
+            # only fetch the keys, most of the issues are expected to be in the persistent cache
+            for issues in self.search_pages(query, fields=["key"], page_size=page_size):
+                keys = [issue["key"] for issue in issues]
+                found = self.get_issues(keys)
+                for key in keys:
+                    if key in found:
+                        yield found[key]
+            return
+
+        for issues in self.search_pages(query, page_size=page_size):
+            self.__cache_issues({issue["key"]: issue for issue in issues}, self.fields)
+            yield from issues
+
+    def list_ids(self, query, page_size=None):
+        """Generator yielding the keys of all issues of the JQL query."""
+        for issues in self.search_pages(query, fields=["key"], page_size=page_size):
+            for issue in issues:
+                yield issue["key"]
 
     def get_issue_uri(self, issue_key):
         return self.__base_url + "/browse/" + issue_key
+
+    def close(self):
+        self.session.close()
+
+
+def create_jira_search(config: dict, options: dict, fields=None) -> JiraSearch:
+    """Returns the JIRA client selected by the `client` config, either `sync` or `async`. `fields` is the profile of
+    the tool, see JiraSearch. With --from-snapshot the issues are served offline from the snapshot file."""
+    if getattr(options, "from_snapshot", None) is not None:
+        from jira_tools.snapshot import SnapshotSearch
+
+        return SnapshotSearch(config, options, options.from_snapshot)
+    if config["jira"]["client"] == "async":
+        # aiohttp is only needed for the async client
+        from jira_tools.async_search import AsyncJiraSearch
+
+        return AsyncJiraSearch(config, options, fields)
+    return JiraSearch(config, options, fields)
@@ -0,0 +1,255 @@
+import argparse
+import io
+import json
+import mimetypes
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import chain
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from jira_tools.dependency_graph import DotGenerator
+from jira_tools.extract import FieldExtractors
+from jira_tools.logging import Logging
+from jira_tools.lru import LruCache
+from jira_tools.query import JiraTraversal
+from jira_tools.search import JiraSearch
+from jira_tools.webhook import GraphDependencies, WebhookReceiver
+
+# seconds issues and responses are kept in memory by the server mode, if the config does not set `memory_cache`.`ttl`
+SERVER_TTL = 600
+
+
+def get_ttl(config: dict):
+    """Returns the `memory_cache`.`ttl` of the server mode, the config leaves it unset for single runs."""
+    ttl = config["jira"]["memory_cache"]["ttl"]
+    return SERVER_TTL if ttl is None else ttl
+
+
+class Coalescer:
+    """Runs a function only once for concurrent calls with the same key, the other callers wait for its result."""
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        # key -> Future of the running call
+        self.__running = {}
+
+    def run(self, key, function):
+        with self.__lock:
+            future = self.__running.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self.__running[key] = future
+
+        if is_owner:
+            try:
+                future.set_result(function())
+            except Exception as error:
+                future.set_exception(error)
+            finally:
+                with self.__lock:
+                    del self.__running[key]
+
+        return future.result()
+
+
+class GraphServer(Logging):
+    """Serves dependency graphs and issue lists over HTTP from one long running process, so the JIRA client and its
+    caches stay warm between the requests. Concurrent identical requests are answered by a single run.
+    Responses are kept until an issue they show is changed, which JIRA reports to the webhook endpoint.
+
+    * `GET /graph?jql=...&issues=A-1,A-2&format=svg&max_depth=2&components=clusters` - the rendered graph
+    * `GET /query?jql=...&issues=A-1&max_depth=2&format=csv` - the issue list of jira-query.py
+    * `POST /webhook` - a JIRA webhook event, see WebhookReceiver
+    """
+
+    # output format of /query -> content type
+    query_content_types = {
+        "text": "text/plain; charset=utf-8",
+        "csv": "text/csv; charset=utf-8",
+        "tsv": "text/tab-separated-values; charset=utf-8",
+        "jsonl": "application/x-ndjson; charset=utf-8",
+    }
+
+    def __init__(self, config: dict, options: dict, jira: JiraSearch):
+        self.config = config
+        self.options = options
+        self.jira = jira
+        self.coalescer = Coalescer()
+        self.dependencies = GraphDependencies()
+        self.webhooks = WebhookReceiver(self.jira, self.dependencies)
+        # shared by all queries, so the values of an issue are only extracted once
+        self.extractors = FieldExtractors(self.config)
+        # request name -> response, graphs of a JQL search can change without a webhook event, so they expire
+        self.__responses = LruCache(
+            self.config["jira"]["memory_cache"]["max_graphs"],
+            get_ttl(self.config),
+        )
+        self.server = ThreadingHTTPServer(
+            (self.options.host, self.options.port), self.__create_handler()
+        )
+        self.server.daemon_threads = True
+
+    def serve_forever(self):
+        threading.Thread(target=self.__refresh, daemon=True).start()
+        self.server.serve_forever()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __refresh(self):
+        """Regularly drops the issues updated in JIRA from the persistent cache and forgets which issues were
+        unavailable, the issues in memory expire on their own."""
+        while True:
+            time.sleep(get_ttl(self.config) or SERVER_TTL)
+            self.jira.unavailable_issues.clear()
+            if self.jira.cache is not None:
+                self.jira.revalidate_cache()
+
+    def handle(self, path):
+        """Returns a tuple (status code, content type, body) for the requested path."""
+        url = urlparse(path)
+        params = parse_qs(url.query)
+        handlers = {"/graph": self.__graph, "/query": self.__query}
+        if url.path not in handlers:
+            return 404, "text/plain; charset=utf-8", b"Not found"
+
+        # identical requests are the same path with the same parameters in any order
+        name = url.path + "?" + urlencode(sorted(params.items()), doseq=True)
+        response = self.__responses.get(name)
+        if response is not None and not self.dependencies.is_stale(name):
+            return response
+        try:
+            return self.coalescer.run(
+                name, lambda: self.__respond(name, handlers[url.path], params)
+            )
+        except ValueError as error:
+            return 400, "text/plain; charset=utf-8", str(error).encode("utf-8")
+        except Exception as error:
+            self.log("Request {} failed: {}".format(path, error))
+            return 500, "text/plain; charset=utf-8", str(error).encode("utf-8")
+
+    def handle_webhook(self, content: bytes):
+        """Applies the JIRA webhook event given as JSON, returns a tuple (status code, content type, body)."""
+        try:
+            event = json.loads(content)
+            result = self.webhooks.handle(event)
+        except (ValueError, KeyError, TypeError) as error:
+            message = "Invalid webhook event: {}".format(error)
+            return 400, "text/plain; charset=utf-8", message.encode("utf-8")
+        return 200, "application/json", json.dumps(result).encode("utf-8")
+
+    def __respond(self, name, handler, params):
+        self.dependencies.begin(name)
+        try:
+            status, content_type, content, keys = handler(params)
+        except Exception:
+            self.dependencies.cancel(name)
+            raise
+        response = (status, content_type, content)
+        # if an issue of the response changed while it was generated, it is generated again on the next request
+        if self.dependencies.register(name, keys):
+            self.__responses.put(name, response)
+        return response
+
+    def __create_options(self, params):
+        """Returns a copy of the options with the issues and the JQL query of the request."""
+        options = argparse.Namespace(**vars(self.options))
+        options.issues = [
+            key for value in params.get("issues", []) for key in value.split(",") if key
+        ]
+        options.jql_query = params.get("jql", [None])[0]
+        if len(options.issues) == 0 and options.jql_query is None:
+            raise ValueError("Either issues or jql is required")
+        if "max_depth" in params:
+            options.max_depth = int(params["max_depth"][0])
+        return options
+
+    def __get_issue_keys(self, options):
+        # if a jql query was given, stream all issues of it after the given issues
+        issue_keys = options.issues
+        if options.jql_query is not None:
+            issue_keys = chain(
+                issue_keys,
+                (issue["key"] for issue in self.jira.query(options.jql_query)),
+            )
+        return issue_keys
+
+    def __graph(self, params):
+        options = self.__create_options(params)
+        format = params.get("format", ["svg"])[0]
+        options.components = params.get("components", ["none"])[0]
+        if options.components not in ["none", "clusters"]:
+            raise ValueError("components has to be none or clusters")
+        # the image is created in a temporary directory, so there is nothing to compare with
+        options.force_render = True
+
+        generator = DotGenerator(
+            self.config, options, self.jira, self.__get_issue_keys(options)
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            image_file_name = os.path.join(directory, "graph")
+            generator.generate_graph(image_file_name, formats=[format])
+            with open(image_file_name + "." + format, "rb") as image_file:
+                content = image_file.read()
+
+        if format == "dot":
+            content_type = "text/vnd.graphviz; charset=utf-8"
+        else:
+            content_type = mimetypes.guess_type("graph." + format)[0]
+        return (
+            200,
+            content_type or "application/octet-stream",
+            content,
+            generator.graph.nodes.keys(),
+        )
+
+    def __query(self, params):
+        options = self.__create_options(params)
+        options.output_format = params.get("format", ["text"])[0]
+        if options.output_format not in self.query_content_types:
+            raise ValueError(
+                "format has to be one of " + ", ".join(self.query_content_types)
+            )
+        output = io.StringIO()
+        traversal = JiraTraversal(
+            self.config, options, self.jira, file=output, extractors=self.extractors
+        )
+        traversal.print_issues(self.__get_issue_keys(options))
+        return (
+            200,
+            self.query_content_types[options.output_format],
+            output.getvalue().encode("utf-8"),
+            traversal.issue_keys,
+        )
+
+    def __create_handler(self):
+        graph_server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                graph_server.log(format % args)
+
+            def do_GET(self):
+                self.__send(*graph_server.handle(self.path))
+
+            def do_POST(self):
+                if urlparse(self.path).path != "/webhook":
+                    self.__send(404, "text/plain; charset=utf-8", b"Not found")
+                    return
+                content = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                self.__send(*graph_server.handle_webhook(content))
+
+            def __send(self, status, content_type, content):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+        return Handler
@@ -0,0 +1,221 @@
+import json
+from datetime import datetime
+
+from jira_tools.extract import FieldExtractors
+from jira_tools.list import chunks
+from jira_tools.logging import Logging
+
+# version of the file format, snapshots of other versions are rejected
+SNAPSHOT_VERSION = 1
+
+# the fields JIRA embeds in the stub of a linked issue
+STUB_FIELDS = ["summary", "status", "priority", "issuetype"]
+
+
+def get_name(value):
+    """Returns the name of a JIRA object like the status, the value itself for plain values."""
+    return value.get("name") if isinstance(value, dict) else value
+
+
+def read_header(file_name) -> dict:
+    """Returns the header of a snapshot file, raises a ValueError if the file is not a snapshot of this version."""
+    with open(file_name) as snapshot_file:
+        try:
+            header = json.loads(snapshot_file.readline())
+        except ValueError:
+            header = {}
+    if (
+        not isinstance(header, dict)
+        or header.get("type") != "snapshot"
+        or header.get("version") != SNAPSHOT_VERSION
+    ):
+        raise ValueError(
+            "{} is not a snapshot of version {}".format(file_name, SNAPSHOT_VERSION)
+        )
+    return header
+
+
+class SnapshotWriter(Logging):
+    """Records the issues a traversal visits and their links and writes them as JSON lines: a header, then a `node`
+    line per issue with its key, status, type, labels, the values of the extractors and the fetched fields, then an
+    `edge` line per link of an expanded issue with the link type and direction. The fields of linked issues that are
+    not expanded can be lazy, the file is therefore only written by `close`, once the traversal is done."""
+
+    def __init__(self, config: dict, options: dict, file_name, fields):
+        self.config = config
+        self.options = options
+        self.file_name = file_name
+        # the fields stored for every issue, the links are stored as edges
+        self.fields = sorted(set(fields) - {"issuelinks"})
+        self.extractors = FieldExtractors(config, memoize=False)
+        # keys of the primary issues, those of depth 0
+        self.issue_keys = []
+        # issue key -> issue, in the order the issues are visited
+        self.issues = {}
+        # tuples (from key, to key, link type name, direction, label)
+        self.edges = []
+
+    @staticmethod
+    def get_fields(config: dict) -> set:
+        """Returns the issue fields needed for the attributes of the nodes."""
+        return {"status", "issuetype", "labels"} | FieldExtractors(config).fields
+
+    def add(self, issue, depth, links):
+        """Records an expanded issue with its links (see IssueTraversal.walk) and the linked issues."""
+        if depth == 0:
+            self.issue_keys.append(issue["key"])
+        self.issues[issue["key"]] = issue
+        for link in links:
+            self.issues.setdefault(link["key"], link["issue"])
+            self.edges.append(
+                (
+                    issue["key"],
+                    link["key"],
+                    link["link"]["type"]["name"],
+                    link["direction"],
+                    link["label"],
+                )
+            )
+
+    def __create_node(self, issue):
+        issue_fields = issue["fields"]
+        # accessing a field a lazy issue does not hold yet loads all pending issues at once
+        for name in self.fields:
+            issue_fields.get(name)
+        return {
+            "type": "node",
+            "key": issue["key"],
+            "status": get_name(issue_fields.get("status")),
+            "issuetype": get_name(issue_fields.get("issuetype")),
+            "labels": issue_fields.get("labels") or [],
+            "values": self.extractors.extract(issue),
+            "fields": {
+                name: issue_fields[name] for name in self.fields if name in issue_fields
+            },
+        }
+
+    def close(self):
+        header = {
+            "type": "snapshot",
+            "version": SNAPSHOT_VERSION,
+            "generated": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
+            "max_depth": self.options.max_depth,
+            "issues": self.issue_keys,
+            "fields": self.fields,
+            "nodes": len(self.issues),
+            "edges": len(self.edges),
+        }
+        lines = [header]
+        lines.extend(self.__create_node(issue) for issue in self.issues.values())
+        lines.extend(
+            {
+                "type": "edge",
+                "from": from_key,
+                "to": to_key,
+                "link_type": link_type,
+                "direction": direction,
+                "label": label,
+            }
+            for from_key, to_key, link_type, direction, label in self.edges
+        )
+        with open(self.file_name, "w") as snapshot_file:
+            for line in lines:
+                snapshot_file.write(json.dumps(line, separators=(",", ":")) + "\n")
+        self.log(
+            "Wrote snapshot {} with {} issues and {} links".format(
+                self.file_name, len(self.issues), len(self.edges)
+            )
+        )
+
+
+class SnapshotSearch(Logging):
+    """Offline replacement of JiraSearch serving the issues of a snapshot, no HTTP calls are made. The links of the
+    issues are rebuilt from the edges, so a traversal of the snapshot visits the same issues and links as the one
+    that wrote it, as long as it does not go deeper. JQL is not evaluated, a search returns the primary issues of the
+    snapshot."""
+
+    def __init__(self, config: dict, options: dict, file_name):
+        self.config = config
+        self.options = options
+        self.page_size = self.config["jira"]["page_size"]
+        # issue keys that are not in the snapshot with the reason
+        self.unavailable_issues = {}
+        # issue key -> issue with its rebuilt links
+        self.__issues = {}
+
+        header = read_header(file_name)
+        with open(file_name) as snapshot_file:
+            # skip the header
+            snapshot_file.readline()
+            edges = []
+            for line in snapshot_file:
+                entry = json.loads(line)
+                if entry["type"] == "node":
+                    self.__issues[entry["key"]] = {
+                        "key": entry["key"],
+                        "fields": dict(entry["fields"], issuelinks=[]),
+                    }
+                elif entry["type"] == "edge":
+                    edges.append(entry)
+
+        for edge in edges:
+            linked_fields = self.__issues[edge["to"]]["fields"]
+            self.__issues[edge["from"]]["fields"]["issuelinks"].append(
+                {
+                    "type": {
+                        "name": edge["link_type"],
+                        edge["direction"]: edge["label"],
+                    },
+                    edge["direction"]
+                    + "Issue": {
+                        "key": edge["to"],
+                        "fields": {
+                            name: linked_fields[name]
+                            for name in STUB_FIELDS
+                            if name in linked_fields
+                        },
+                    },
+                }
+            )
+
+        # the primary issues of the snapshot
+        self.issue_keys = header["issues"]
+        self.link_fields = frozenset(header["fields"])
+        self.fields = self.link_fields | frozenset(["status", "issuelinks"])
+        self.log(
+            "Loaded snapshot {} with {} issues and {} links".format(
+                file_name, len(self.__issues), len(edges)
+            )
+        )
+
+    def get_issue(self, key, fields=None):
+        """Returns the issue, None if it is not in the snapshot. `fields` is ignored, all stored fields are returned."""
+        issue = self.__issues.get(key)
+        if issue is None:
+            self.unavailable_issues[key] = "not in snapshot"
+        return issue
+
+    def get_issues(self, keys, fields=None):
+        """Returns a dict of issue key to issue for the keys in the snapshot."""
+        issues = {}
+        for key in dict.fromkeys(keys):
+            issue = self.get_issue(key, fields)
+            if issue is not None:
+                issues[key] = issue
+        return issues
+
+    def search_pages(self, query, fields=None, page_size=None):
+        """Generator yielding the primary issues of the snapshot in lists of `page_size`, the query is not evaluated."""
+        for keys in chunks(self.issue_keys, page_size or self.page_size):
+            issues = self.get_issues(keys)
+            yield [issues[key] for key in keys if key in issues]
+
+    def query(self, query, page_size=None):
+        for issues in self.search_pages(query, page_size=page_size):
+            yield from issues
+
+    def list_ids(self, query, page_size=None):
+        yield from self.issue_keys
+
+    def close(self):
+        pass
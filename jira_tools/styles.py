@@ -0,0 +1,82 @@
+class StyleRules:
+    """The `overrides` of the config compiled into predicates once, so styling a node does not need to interpret the
+    config again. The resulting layout is cached per issue key."""
+
+    def __init__(self, config: dict):
+        self.default_layout = dict(
+            fillColor=config["layout"]["defaults"]["fillColor"],
+            boxStyle=config["layout"]["defaults"]["boxStyle"],
+            fontName=config["layout"]["defaults"]["fontName"],
+        )
+        # list of tuples (predicates, layout), in the order the rules are applied
+        self.rules = []
+        # the issue fields the rules look at, they have to be fetched for every node
+        self.fields = set()
+        overrides = config.get("overrides", {})
+        for rule_index in sorted(overrides.keys(), key=int):
+            rule = overrides[rule_index]
+            self.rules.append(
+                (
+                    [
+                        self.__compile_match_rule(match_rule)
+                        for match_rule in rule["matchRules"]
+                    ],
+                    rule["layout"],
+                )
+            )
+        self.__layouts = {}
+
+    def __compile_match_rule(self, match_rule):
+        """Returns a predicate getting the issue key, fields and the set of labels of the issue."""
+        value = match_rule["value"]
+
+        if match_rule["type"] == "has_label":
+            self.fields.add("labels")
+            return lambda issue_key, issue_fields, labels: value in labels
+
+        if match_rule["type"] == "key_in":
+            keys = frozenset(value)
+            return lambda issue_key, issue_fields, labels: issue_key in keys
+
+        if match_rule["type"] == "status_in":
+            statuses = frozenset(value)
+            self.fields.add("status")
+            return (
+                lambda issue_key, issue_fields, labels: issue_fields["status"]["name"]
+                in statuses
+            )
+
+        if match_rule["type"] == "field_value":
+            field_name = value["field"]
+            field_value = value["value"]
+            self.fields.add(field_name)
+            if value["field_type"] == "list":
+                # the field is a list, therefore compare against the names of the values only
+                return lambda issue_key, issue_fields, labels: any(
+                    v["name"] == field_value for v in issue_fields.get(field_name) or []
+                )
+
+        # unknown rule types never match
+        return lambda issue_key, issue_fields, labels: False
+
+    def get_layout(self, issue_key, issue_fields) -> dict:
+        """Returns the layout for the issue, that is the default layout updated by the last matching rule."""
+        if issue_key not in self.__layouts:
+            layout = self.default_layout
+            # only look at the labels if a rule needs them, the fields can be lazy
+            labels = (
+                frozenset(issue_fields.get("labels") or [])
+                if "labels" in self.fields
+                else frozenset()
+            )
+            # later rules overwrite previous ones, so the first match from the end is the one that applies
+            for predicates, rule_layout in reversed(self.rules):
+                if all(
+                    predicate(issue_key, issue_fields, labels)
+                    for predicate in predicates
+                ):
+                    layout = self.default_layout | rule_layout
+                    break
+            self.__layouts[issue_key] = layout
+
+        return self.__layouts[issue_key]
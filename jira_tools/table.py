@@ -0,0 +1,56 @@
+import csv
+import io
+import json
+
+
+class TableWriter:
+    """Writes rows, dicts with the given columns, as `csv`, `tsv`, `jsonl` or aligned `text` to a text file. The rows
+    are collected in a buffer that is written in blocks of `buffer_rows`, so a large report does not cost a write per
+    row."""
+
+    # width of the columns of the text format
+    text_width = 20
+
+    def __init__(self, file, format, columns, buffer_rows=1000):
+        self.file = file
+        self.format = format
+        self.columns = list(columns)
+        self.buffer_rows = buffer_rows
+        self.__buffer = io.StringIO()
+        self.__rows = 0
+        self.__writer = None
+        if self.format == "text":
+            self.__write_text(self.columns)
+        elif self.format != "jsonl":
+            self.__writer = csv.writer(
+                self.__buffer,
+                delimiter="\t" if self.format == "tsv" else ",",
+                lineterminator="\n",
+            )
+            self.__writer.writerow(self.columns)
+
+    def write(self, row: dict):
+        if self.format == "text":
+            self.__write_text([row[column] for column in self.columns])
+        elif self.__writer is None:
+            self.__buffer.write(
+                json.dumps({column: row[column] for column in self.columns}) + "\n"
+            )
+        else:
+            self.__writer.writerow([row[column] for column in self.columns])
+        self.__rows += 1
+        if self.__rows % self.buffer_rows == 0:
+            self.flush()
+
+    def __write_text(self, values):
+        line = " ".join(f"{value!s: <{self.text_width}}" for value in values)
+        self.__buffer.write(line.rstrip() + "\n")
+
+    def flush(self):
+        self.file.write(self.__buffer.getvalue())
+        self.__buffer.seek(0)
+        self.__buffer.truncate()
+
+    def close(self):
+        self.flush()
+        self.file.flush()
@@ -0,0 +1,198 @@
+from jira_tools.list import chunks
+from jira_tools.logging import Logging
+from jira_tools.profile import profile
+from jira_tools.view import LazyIssues
+
+
+class IssueTraversal(Logging):
+    """Breadth first traversal over JIRA issues and their links. Each level of the traversal is fetched in batches
+    before it is handed out and every issue is expanded only once."""
+
+    def __init__(
+        self, config: dict, options: dict, jira, link_filter=None, snapshot=None
+    ):
+        self.config = config
+        self.options = options
+        self.jira = jira
+        self.max_depth = self.options.max_depth
+        # optional callable getting a link dict (see __get_links), returns False to drop the link
+        self.link_filter = link_filter
+        # optional SnapshotWriter recording the expanded issues and their links
+        self.snapshot = snapshot
+        self.lazy_issues = LazyIssues(self.jira, self.jira.link_fields)
+
+    def walk(self, issue_keys):
+        """Generator yielding a tuple (issue, depth, links) for every expanded issue. The primary issues have depth 0
+        and can be given as a stream. Linked issues are expanded as long as their depth is lower than `max_depth`, so
+        the default of 1 only shows the direct links of the primary issues. `links` is the list of accepted links of
+        the issue, each with the linked `issue` added. Linked issues that are not expanded are lazy, they hold the
+        fields of the link stub until another field is accessed (see LazyIssues)."""
+        visited = set()
+        # dict as ordered set of the keys of the next level
+        frontier = {}
+
+        # the primary issues can be a stream, therefore they are handled chunk by chunk
+        for keys in chunks(issue_keys, self.config["jira"]["page_size"]):
+            with profile.phase("fetch issues"):
+                issues = self.jira.get_issues(keys)
+            keys = [
+                key
+                for key in keys
+                if key in issues and self.__is_primary_issue_allowed(key, issues[key])
+            ]
+            yield from self.__expand(keys, 0, visited, frontier)
+
+        depth = 1
+        while len(frontier) > 0:
+            next_frontier = {}
+            yield from self.__expand(list(frontier), depth, visited, next_frontier)
+            frontier = next_frontier
+            depth += 1
+
+    def __expand(self, keys, depth, visited, frontier):
+        expanded = []
+        for key in keys:
+            if key in visited:
+                continue
+            visited.add(key)
+
+            issue = self.jira.get_issue(key)
+            links = self.__get_links(issue) if depth < self.max_depth else []
+            expanded.append((issue, links))
+
+        # fetch all linked issues of this level that are expanded afterwards in one go, the others are taken from the
+        # stubs embedded in the links and only fetched if a field is needed the stub does not hold
+        followed_keys = []
+        if depth + 1 < self.max_depth:
+            followed_keys = [
+                link["key"]
+                for issue, links in expanded
+                for link in links
+                if link["direction"] in self.config["jira"]["directions"]
+            ]
+        with profile.phase("fetch issues"):
+            linked_issues = self.jira.get_issues(followed_keys)
+
+        # drop links to issues that could not be fetched, the lazy issues of the whole level are created before any
+        # is handed out, so they are loaded together
+        expanded = [
+            (
+                issue,
+                [
+                    link
+                    for link in links
+                    if link["key"] not in self.jira.unavailable_issues
+                ],
+            )
+            for issue, links in expanded
+        ]
+        for issue, links in expanded:
+            for link in links:
+                link["issue"] = linked_issues.get(link["key"]) or self.lazy_issues.get(
+                    link["link"][link["direction"] + "Issue"]
+                )
+
+        profile.count("issues expanded", len(expanded))
+        profile.count("links", sum(len(links) for issue, links in expanded))
+        for issue, links in expanded:
+            if self.snapshot is not None:
+                self.snapshot.add(issue, depth, links)
+            yield issue, depth, links
+
+            if depth + 1 >= self.max_depth:
+                continue
+            for link in links:
+                if (
+                    link["direction"] in self.config["jira"]["directions"]
+                    and link["key"] not in visited
+                ):
+                    frontier[link["key"]] = True
+
+    def __is_primary_issue_allowed(self, issue_key, issue):
+        # filter out if the status of the issue is an ignored one
+        if issue["fields"]["status"]["name"] in self.config["jira"]["ignored_statuses"]:
+            self.log(
+                "Skipping {} as its status {} is ignored".format(
+                    issue_key, issue["fields"]["status"]["name"]
+                )
+            )
+            return False
+
+        # if the issue does not belong to the allowed JIRA projects, then skip it
+        if not self.__belongs_to_allowed_project(issue_key):
+            self.log(
+                "Skipping " + issue_key + " - not traversing to blacklisted project"
+            )
+            return False
+
+        return True
+
+    def __belongs_to_allowed_project(self, issue_key):
+        if (
+            "allowed_project_keys" in self.config["jira"]
+            and len(self.config["jira"]["allowed_project_keys"]) > 0
+        ):
+            return (
+                issue_key.split("-", 1)[0]
+                in self.config["jira"]["allowed_project_keys"]
+            )
+        return True
+
+    def __get_links(self, issue):
+        """Returns the accepted links of the issue as dicts with the keys `direction` (inward or outward), `key` of the
+        linked issue, `label` of the link type for the direction and the original `link`."""
+        links = []
+        for link in issue["fields"].get("issuelinks", []):
+            # don't handle the link if it is an ignored one
+            if link["type"]["name"] in self.config["jira"]["ignored_link_type_names"]:
+                continue
+
+            # specify the direction of the relation based on the jira direction of the link
+            if "outwardIssue" in link:
+                direction = "outward"
+            elif "inwardIssue" in link:
+                direction = "inward"
+            else:
+                continue
+
+            linked_issue = link[direction + "Issue"]
+            linked_issue_key = linked_issue["key"]
+            link = {
+                "direction": direction,
+                "key": linked_issue_key,
+                "label": link["type"][direction].strip(),
+                "link": link,
+            }
+
+            if self.link_filter is not None and not self.link_filter(link):
+                continue
+
+            # if the issue does not belong to the allowed JIRA projects, then skip it
+            if not self.__belongs_to_allowed_project(linked_issue_key):
+                self.log(
+                    "Skipping linked issue "
+                    + linked_issue_key
+                    + " - not traversing to blacklisted project"
+                )
+                continue
+
+            # skip the link if excluded via config
+            if linked_issue_key in self.config["jira"]["issue_excludes"]:
+                self.log("Skipping " + linked_issue_key + " - explicitly excluded")
+                continue
+
+            # skip ignored statuses of links
+            if (
+                linked_issue["fields"]["status"]["name"]
+                in self.config["jira"]["links"]["ignored_statuses"]
+            ):
+                self.log(
+                    "Skipping "
+                    + linked_issue_key
+                    + " - linked key is ignored as its status is ignored"
+                )
+                continue
+
+            links.append(link)
+
+        return links
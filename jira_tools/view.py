@@ -0,0 +1,82 @@
+from jira_tools.logging import Logging
+from jira_tools.profile import profile
+
+
+def get_linked_keys(issue: dict) -> set:
+    """Returns the keys of the issues the links of an issue embed a stub of."""
+    return {
+        link[direction + "Issue"]["key"]
+        for link in issue.get("fields", {}).get("issuelinks") or []
+        for direction in ["inward", "outward"]
+        if direction + "Issue" in link
+    }
+
+
+class LazyFields(dict):
+    """The fields of an issue, initially only those of the stub embedded in a link (summary, status, issuetype and
+    priority). Accessing a field the stub does not hold loads the issue, together with all other pending issues of
+    the same LazyIssues."""
+
+    def __init__(self, issue_key, stub_fields: dict, issues):
+        super().__init__(stub_fields)
+        self.issue_key = issue_key
+        self.issues = issues
+        self.loaded = False
+
+    def fill(self, fields: dict):
+        self.loaded = True
+        self.update(fields)
+
+    def __load(self, name):
+        if not self.loaded and not dict.__contains__(self, name):
+            self.issues.load()
+
+    def __missing__(self, name):
+        self.__load(name)
+        if dict.__contains__(self, name):
+            return dict.__getitem__(self, name)
+        raise KeyError(name)
+
+    def get(self, name, default=None):
+        self.__load(name)
+        return super().get(name, default)
+
+
+class LazyIssues(Logging):
+    """Creates issues from the stubs embedded in links, which are only fetched if a field is accessed the stub does
+    not hold. All pending issues are then fetched at once with the given fields, so the issues of one level of the
+    traversal share their batches."""
+
+    def __init__(self, jira, fields):
+        self.config = jira.config
+        self.options = jira.options
+        self.jira = jira
+        self.fields = fields
+        # issue key -> issue dict with LazyFields
+        self.__issues = {}
+        # dict as ordered set of the keys that are not loaded yet
+        self.__pending = {}
+
+    def get(self, linked_issue: dict) -> dict:
+        """Returns the issue for the `inwardIssue` or `outwardIssue` of a link."""
+        key = linked_issue["key"]
+        if key not in self.__issues:
+            self.__issues[key] = {
+                "key": key,
+                "fields": LazyFields(key, linked_issue.get("fields", {}), self),
+            }
+            self.__pending[key] = True
+        return self.__issues[key]
+
+    def load(self):
+        """Fetches all pending issues, issues that are unavailable keep the fields of their stub."""
+        keys = list(self.__pending)
+        self.__pending = {}
+        self.log("Loading {} linked issues".format(len(keys)))
+        profile.count("lazy issues loaded", len(keys))
+        with profile.phase("fetch linked issues"):
+            issues = self.jira.get_issues(keys, self.fields)
+        for key in keys:
+            self.__issues[key]["fields"].fill(
+                issues[key]["fields"] if key in issues else {}
+            )
@@ -0,0 +1,114 @@
+import threading
+
+from jira_tools.logging import Logging
+from jira_tools.search import JiraSearch
+
+
+class GraphDependencies:
+    """Tracks the issue keys each generated graph depends on, so a change of an issue marks only the graphs showing
+    it as stale. Graphs are identified by any hashable name, e.g. the request they were generated for."""
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        # graph name -> frozenset of issue keys
+        self.__keys = {}
+        # issue key -> set of graph names
+        self.__graphs = {}
+        self.__stale = set()
+        # graph name -> set of the issue keys changed since its generation started
+        self.__changed_keys = {}
+
+    def begin(self, graph):
+        """Starts collecting the issue keys changed while the graph is generated, see `register`."""
+        with self.__lock:
+            self.__changed_keys[graph] = set()
+
+    def cancel(self, graph):
+        """Stops collecting the changed issue keys of a graph whose generation failed."""
+        with self.__lock:
+            self.__changed_keys.pop(graph, None)
+
+    def register(self, graph, keys) -> bool:
+        """Records the keys of a freshly generated graph, which is not stale anymore. If one of them changed since
+        `begin`, the graph may show the issue before the change, it stays stale and False is returned."""
+        keys = frozenset(keys)
+        with self.__lock:
+            self.__remove(graph)
+            self.__keys[graph] = keys
+            for key in keys:
+                self.__graphs.setdefault(key, set()).add(graph)
+            if keys.isdisjoint(self.__changed_keys.pop(graph, ())):
+                self.__stale.discard(graph)
+                return True
+            self.__stale.add(graph)
+            return False
+
+    def __remove(self, graph):
+        for key in self.__keys.pop(graph, frozenset()):
+            graphs = self.__graphs[key]
+            graphs.discard(graph)
+            if len(graphs) == 0:
+                del self.__graphs[key]
+
+    def mark_changed(self, keys) -> list:
+        """Marks all graphs depending on one of the given issue keys as stale and returns them."""
+        with self.__lock:
+            graphs = set()
+            for key in keys:
+                graphs |= self.__graphs.get(key, set())
+            self.__stale |= graphs
+            for changed_keys in self.__changed_keys.values():
+                changed_keys.update(keys)
+        return sorted(graphs)
+
+    def is_stale(self, graph) -> bool:
+        with self.__lock:
+            return graph in self.__stale
+
+
+class WebhookReceiver(Logging):
+    """Applies JIRA webhook events to the issues held by the JIRA client and marks the graphs depending on the changed
+    issues as stale. Handled events:
+
+    * `jira:issue_updated` - the issue is patched with the fields of the event
+    * `jira:issue_deleted` - the issue is dropped from the caches
+    * `issuelink_created`, `issuelink_deleted` - both linked issues are dropped from the caches, so their links are
+      fetched again. The event only holds the ids of the issues, ids of issues that were never fetched are skipped.
+    """
+
+    def __init__(self, jira: JiraSearch, dependencies: GraphDependencies):
+        self.options = jira.options
+        self.jira = jira
+        self.dependencies = dependencies
+
+    def handle(self, event: dict) -> dict:
+        """Returns a dict with the name of the event, the changed issue `keys` and the `stale` graphs."""
+        name = event.get("webhookEvent")
+        keys = []
+        if name == "jira:issue_updated":
+            keys = [event["issue"]["key"]]
+            self.jira.patch_issue(event["issue"])
+        elif name == "jira:issue_deleted":
+            keys = [event["issue"]["key"]]
+            self.jira.invalidate(keys)
+        elif name in ["issuelink_created", "issuelink_deleted"]:
+            issue_ids = [
+                event["issueLink"]["sourceIssueId"],
+                event["issueLink"]["destinationIssueId"],
+            ]
+            keys = [
+                key
+                for key in (self.jira.get_key(issue_id) for issue_id in issue_ids)
+                if key is not None
+            ]
+            self.jira.invalidate(keys)
+        else:
+            self.log("Ignoring webhook event {}".format(name))
+
+        stale = self.dependencies.mark_changed(keys)
+        self.log(
+            "Webhook event {} changed {}, {} stale graphs".format(
+                name, ", ".join(keys), len(stale)
+            )
+        )
+        return {"webhookEvent": name, "keys": keys, "stale": stale}
@@ -0,0 +1,76 @@
+"""Analyzes small dependency graphs, the edges are labeled like the links JIRA shows from both of their issues."""
+from jira_tools.analysis import GraphAnalysis
+from jira_tools.graph import Graph
+
+
+def create_graph(*edges) -> Graph:
+    graph = Graph()
+    for from_key, to_key, label in edges:
+        graph.add_node(from_key, {})
+        graph.add_node(to_key, {})
+        graph.add_edge(from_key, to_key, label)
+    return graph
+
+
+def test_cycles_are_found():
+    graph = create_graph(
+        ("A-1", "A-2", "blocks"),
+        ("A-2", "A-3", "blocks"),
+        ("A-3", "A-1", "blocks"),
+        ("A-3", "A-4", "blocks"),
+        ("A-4", "A-4", "blocks"),
+        ("A-4", "A-5", "blocks"),
+    )
+    analysis = GraphAnalysis(graph, {})
+    assert [sorted(cycle) for cycle in analysis.cycles] == [
+        ["A-1", "A-2", "A-3"],
+        ["A-4"],
+    ]
+    assert analysis.topological_order.index("A-4") > 2
+    assert analysis.topological_order[-1] == "A-5"
+
+
+def test_link_shown_from_both_issues_is_one_dependency():
+    # A-1 blocks A-2, A-2 shows the same link inward
+    inward_edge = ("A-2", "A-1", "is blocked by")
+    graph = create_graph(("A-1", "A-2", "blocks"), inward_edge)
+    analysis = GraphAnalysis(graph, {}, inward_edges=[inward_edge])
+    report = analysis.as_dict()
+    assert report["edges"] == 1
+    assert report["cycles"] == []
+    assert report["topological_order"] == ["A-1", "A-2"]
+
+
+def test_only_edges_with_the_labels_are_dependencies():
+    graph = create_graph(("A-1", "A-2", "blocks"), ("A-2", "A-1", "relates to"))
+    analysis = GraphAnalysis(graph, {}, edge_labels=["blocks"])
+    assert analysis.cycles == []
+
+
+def test_critical_path_is_the_heaviest_path_in_order():
+    graph = create_graph(
+        ("A-1", "A-2", "blocks"),
+        ("A-1", "A-3", "blocks"),
+        ("A-2", "A-4", "blocks"),
+        ("A-3", "A-4", "blocks"),
+        ("A-5", "A-4", "blocks"),
+    )
+    weights = {"A-1": 1, "A-2": 2, "A-3": 5, "A-4": 3, "A-5": 4}
+    path, edges, weight = GraphAnalysis(graph, weights).critical_path()
+    assert path == ["A-1", "A-3", "A-4"]
+    assert edges == [("A-1", "A-3"), ("A-3", "A-4")]
+    assert weight == 9
+
+
+def test_critical_path_passes_all_issues_of_a_cycle():
+    graph = create_graph(
+        ("A-1", "A-2", "blocks"),
+        ("A-2", "A-3", "blocks"),
+        ("A-3", "A-2", "blocks"),
+        ("A-3", "A-4", "blocks"),
+    )
+    weights = {"A-1": 1, "A-2": 2, "A-3": 3, "A-4": 1}
+    path, edges, weight = GraphAnalysis(graph, weights).critical_path()
+    assert path == ["A-1", "A-2", "A-3", "A-4"]
+    assert edges == [("A-1", "A-2"), ("A-3", "A-4")]
+    assert weight == 7
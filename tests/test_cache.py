@@ -0,0 +1,63 @@
+"""Runs jira-query.py twice with a persistent cache and fills the memory of the client against the fake JIRA of the
+benchmarks, see test_webhook.py for the issues it serves."""
+import io
+import json
+
+from benchmarks.fake_jira import FakeJira
+from jira_tools.config import ConfigAndOptions
+from jira_tools.query import JiraTraversal
+from jira_tools.search import JiraSearch
+
+
+def run_query(config_file, issue_key):
+    config, options = ConfigAndOptions().get_config_and_options(
+        ["--config-file", str(config_file), issue_key]
+    )
+    jira = JiraSearch(config, options, JiraTraversal.get_fields(config))
+    output = io.StringIO()
+    JiraTraversal(config, options, jira, file=output).print_issues(options.issues)
+    jira.close()
+    return output.getvalue()
+
+
+def test_updated_linked_issue_is_not_served_from_cached_links(tmp_path, monkeypatch):
+    monkeypatch.setenv("JIRA_ACCESS_TOKEN", "token")
+    fake = FakeJira(issues=7, fan_out=2).start()
+    config_file = tmp_path / "config.json"
+    config_file.write_text(
+        json.dumps(
+            {"jira": {"url": fake.url, "cache": {"file": str(tmp_path / "cache")}}}
+        )
+    )
+    try:
+        assert "DEMO-1: Issue 1 " in run_query(config_file, "DEMO-0")
+
+        # the next run finds DEMO-1 updated, DEMO-0 holds a stub of it in its links
+        fake.rename_issue(1, "Renamed issue 1")
+        assert "DEMO-1: Renamed issue 1 " in run_query(config_file, "DEMO-0")
+    finally:
+        fake.stop()
+
+
+def test_issues_dropped_from_memory_are_dropped_from_the_indexes(tmp_path, monkeypatch):
+    monkeypatch.setenv("JIRA_ACCESS_TOKEN", "token")
+    fake = FakeJira(issues=7, fan_out=2).start()
+    config_file = tmp_path / "config.json"
+    config_file.write_text(
+        json.dumps({"jira": {"url": fake.url, "memory_cache": {"max_issues": 2}}})
+    )
+    config, options = ConfigAndOptions().get_config_and_options(
+        ["--config-file", str(config_file)]
+    )
+    jira = JiraSearch(config, options)
+    try:
+        for index in range(4):
+            jira.get_issue("DEMO-{}".format(index))
+        assert jira.get_key("10000") is None
+        assert jira.get_key("10003") == "DEMO-3"
+
+        jira.invalidate(["DEMO-3"])
+        assert jira.get_key("10003") is None
+    finally:
+        jira.close()
+        fake.stop()
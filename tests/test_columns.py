@@ -0,0 +1,61 @@
+"""Aggregates an IssueTable filled with issues whose description holds the estimation, see `query`.`extractors`."""
+import pytest
+
+from jira_tools.columns import IssueTable
+from jira_tools.config import ConfigAndOptions
+
+
+def create_issue(i, estimation):
+    return {
+        "key": "DEMO-{}".format(i),
+        "fields": {
+            "status": {"name": "Open" if i % 2 else "Done"},
+            "description": "h3. Estimation\n{}\n".format(estimation),
+        },
+    }
+
+
+def test_sum_of_estimation_maps_the_sizes_to_numbers():
+    table = IssueTable(ConfigAndOptions().apply_defaults({"jira": {}}))
+    table.extend(
+        create_issue(i, estimation) for i, estimation in enumerate(["S", "M", "XL"])
+    )
+    table.append({"key": "DEMO-3", "fields": {"status": {"name": "Open"}}})
+
+    rows = table.aggregate(["status"], ["estimation"])
+    assert rows == [
+        {"status": "Done", "count": 2, "sum(estimation)": 2.0 + 8.0},
+        {"status": "Open", "count": 2, "sum(estimation)": 3.0},
+    ]
+    # the sizes are still grouped by as strings
+    assert {row["estimation"] for row in table.aggregate(["estimation"])} == {
+        "S",
+        "M",
+        "XL",
+        "Unknown",
+    }
+
+
+def test_sum_of_string_column_is_rejected():
+    table = IssueTable(ConfigAndOptions().apply_defaults({"jira": {}}))
+    table.append(create_issue(0, "S"))
+    with pytest.raises(ValueError, match="not a number column"):
+        table.aggregate(["estimation"], ["status"])
+
+
+def test_only_fields_of_the_used_columns_are_fetched():
+    config = ConfigAndOptions().apply_defaults({"jira": {}})
+    assert IssueTable(config, ["status"]).fields == {"status"}
+    assert IssueTable(config, ["epic"], ["estimation"]).fields == {
+        "parent",
+        "description",
+    }
+    assert IssueTable(config, ["link"]).fields == {"issuelinks"}
+
+
+def test_unknown_column_is_rejected_before_filling_the_table():
+    config = ConfigAndOptions().apply_defaults({"jira": {}})
+    with pytest.raises(ValueError, match="Unknown column nope"):
+        IssueTable(config, ["status", "nope"])
+    with pytest.raises(ValueError, match="not a number column"):
+        IssueTable(config, ["status"], ["label"])
@@ -0,0 +1,59 @@
+"""Generates graphs of the fake JIRA of the benchmarks with the layout engine replaced, see test_webhook.py for the
+issues it serves."""
+import json
+import subprocess
+
+import pytest
+
+from benchmarks.fake_jira import FakeJira
+from jira_tools.config import ConfigAndOptions
+from jira_tools.dependency_graph import DotGenerator
+from jira_tools.search import JiraSearch
+
+
+@pytest.fixture
+def engine_calls(monkeypatch):
+    """Records the calls of the layout engine instead of starting it."""
+    calls = []
+    monkeypatch.setattr(
+        subprocess, "run", lambda arguments, **_: calls.append(arguments)
+    )
+    return calls
+
+
+@pytest.fixture
+def generate_graph(tmp_path, monkeypatch):
+    monkeypatch.setenv("JIRA_ACCESS_TOKEN", "token")
+    fake = FakeJira(issues=7, fan_out=2).start()
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps({"jira": {"url": fake.url}}))
+
+    def generate_graph(formats):
+        config, options = ConfigAndOptions().get_config_and_options(
+            ["--config-file", str(config_file), "DEMO-0"]
+        )
+        jira = JiraSearch(config, options, DotGenerator.get_fields(config))
+        DotGenerator(config, options, jira, options.issues).generate_graph(
+            str(tmp_path / "graph"), formats=formats
+        )
+        jira.close()
+
+    yield generate_graph
+    fake.stop()
+
+
+def test_dot_format_does_not_start_the_engine(tmp_path, engine_calls, generate_graph):
+    generate_graph(["dot"])
+    assert engine_calls == []
+    assert (tmp_path / "graph.dot").read_text().startswith("digraph{")
+    manifest = json.loads((tmp_path / "graph.manifest.json").read_text())
+    assert manifest["rendered"] is False
+
+
+def test_dot_format_is_kept_next_to_rendered_formats(
+    tmp_path, engine_calls, generate_graph
+):
+    generate_graph(["dot", "svg"])
+    graph = str(tmp_path / "graph")
+    assert engine_calls == [["dot", "-Tsvg", "-o", graph + ".svg", graph + ".dot"]]
+    assert (tmp_path / "graph.dot").exists()
@@ -0,0 +1,34 @@
+"""Checks that `python -m jira_tools <command> --help` does not import the modules only needed to run a command and
+stays within a generous import time budget. The wall time of the start up is measured by `benchmarks/startup.py`,
+its budget depends on the machine."""
+import pytest
+
+from benchmarks.startup import DEFERRED_MODULES, get_imported_modules
+from jira_tools.cli import COMMANDS
+
+# milliseconds the import of the command line interface may take, it takes a few, importing the HTTP client alone
+# takes more than this
+IMPORT_BUDGET_MS = 50
+
+
+@pytest.mark.parametrize("command", list(COMMANDS))
+def test_help_does_not_load_deferred_modules(command):
+    modules = get_imported_modules(["-m", "jira_tools", command, "--help"])
+    # the interpreter ran the command, its own modules are imported
+    assert "jira_tools.cli" in modules
+    assert [module for module in DEFERRED_MODULES if module in modules] == []
+
+
+def test_import_time_of_the_command_line_interface_is_within_budget():
+    # the fastest of a few runs, so a busy machine does not fail the test
+    import_time = min(
+        sum(
+            microseconds
+            for module, microseconds in get_imported_modules(
+                ["-m", "jira_tools", "graph", "--help"]
+            ).items()
+            if module in ["jira_tools", "jira_tools.cli"]
+        )
+        for _ in range(3)
+    )
+    assert import_time / 1000 < IMPORT_BUDGET_MS
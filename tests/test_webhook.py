@@ -0,0 +1,156 @@
+"""Posts the recorded JIRA webhook events of `tests/webhooks` to a running GraphServer, which fetches its issues from
+the fake JIRA of the benchmarks. The fake serves a tree where DEMO-0 links to DEMO-1 and DEMO-2, DEMO-1 to DEMO-3 and
+DEMO-4 and DEMO-2 to DEMO-5 and DEMO-6. The id of DEMO-i is 10000 + i."""
+import json
+import os
+import threading
+
+import pytest
+import requests
+
+from benchmarks.fake_jira import FakeJira
+from jira_tools.config import ConfigAndOptions
+from jira_tools.dependency_graph import DotGenerator
+from jira_tools.query import JiraTraversal
+from jira_tools.search import JiraSearch
+from jira_tools.server import GraphServer
+from jira_tools.webhook import GraphDependencies
+
+WEBHOOKS = os.path.join(os.path.dirname(__file__), "webhooks")
+
+
+def load_event(name):
+    with open(os.path.join(WEBHOOKS, name + ".json"), "rb") as event_file:
+        return event_file.read()
+
+
+@pytest.fixture
+def fake():
+    fake = FakeJira(issues=7, fan_out=2).start()
+    yield fake
+    fake.stop()
+
+
+@pytest.fixture
+def server_url(fake, tmp_path, monkeypatch):
+    monkeypatch.setenv("JIRA_ACCESS_TOKEN", "token")
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps({"jira": {"url": fake.url}}))
+    config, options = ConfigAndOptions().get_config_and_options(
+        ["--config-file", str(config_file), "--port", "0"]
+    )
+    jira = JiraSearch(
+        config,
+        options,
+        DotGenerator.get_fields(config) | JiraTraversal.get_fields(config),
+    )
+    server = GraphServer(config, options, jira)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield "http://127.0.0.1:{}".format(server.server.server_address[1])
+    server.close()
+    jira.close()
+
+
+def post_event(server_url, name):
+    response = requests.post(server_url + "/webhook", data=load_event(name))
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_issue_updated_regenerates_graphs_showing_the_issue(fake, server_url):
+    assert "DEMO-1: Issue 1 " in requests.get(server_url + "/query?issues=DEMO-0").text
+
+    # DEMO-1 is only shown from the stub in the links of DEMO-0
+    fake.rename_issue(1, "Renamed issue 1")
+    result = post_event(server_url, "issue_updated")
+    assert result["keys"] == ["DEMO-1"]
+    assert result["stale"] == ["/query?issues=DEMO-0"]
+
+    content = requests.get(server_url + "/query?issues=DEMO-0").text
+    assert "DEMO-1: Renamed issue 1 " in content
+
+
+def test_issue_updated_keeps_other_responses(fake, server_url):
+    content = requests.get(server_url + "/query?issues=DEMO-2").text
+
+    result = post_event(server_url, "issue_updated")
+    assert result["stale"] == []
+
+    request_count = fake.request_count
+    assert requests.get(server_url + "/query?issues=DEMO-2").text == content
+    assert fake.request_count == request_count
+
+
+def test_issue_deleted_marks_graphs_stale(fake, server_url):
+    requests.get(server_url + "/query?issues=DEMO-0")
+    requests.get(server_url + "/query?issues=DEMO-1")
+
+    result = post_event(server_url, "issue_deleted")
+    assert result["keys"] == ["DEMO-2"]
+    assert result["stale"] == ["/query?issues=DEMO-0"]
+
+
+def test_issuelink_created_drops_both_issues(fake, server_url):
+    # DEMO-3 and DEMO-5 are fetched by key, so their ids are known
+    requests.get(server_url + "/query?issues=DEMO-1,DEMO-2&max_depth=2")
+
+    result = post_event(server_url, "issuelink_created")
+    assert result["keys"] == ["DEMO-3", "DEMO-5"]
+    assert result["stale"] == ["/query?issues=DEMO-1%2CDEMO-2&max_depth=2"]
+
+    request_count = fake.request_count
+    requests.get(server_url + "/query?issues=DEMO-1,DEMO-2&max_depth=2")
+    assert fake.request_count > request_count
+
+
+def test_issuelink_deleted_drops_both_issues(fake, server_url):
+    requests.get(server_url + "/query?issues=DEMO-0")
+
+    result = post_event(server_url, "issuelink_deleted")
+    assert result["keys"] == ["DEMO-0", "DEMO-1"]
+    assert result["stale"] == ["/query?issues=DEMO-0"]
+
+
+def test_issuelink_of_issues_never_fetched_is_skipped(fake, server_url):
+    requests.get(server_url + "/query?issues=DEMO-2")
+
+    result = post_event(server_url, "issuelink_deleted")
+    assert result["keys"] == []
+    assert result["stale"] == []
+
+
+def test_issue_updated_while_generating_is_not_lost(fake, server_url, monkeypatch):
+    print_issues = JiraTraversal.print_issues
+    events = []
+
+    def print_issues_and_update(traversal, issue_keys):
+        print_issues(traversal, issue_keys)
+        # DEMO-1 changes after it was printed, before the response is complete
+        if len(events) == 0:
+            fake.rename_issue(1, "Renamed issue 1")
+            events.append(post_event(server_url, "issue_updated"))
+
+    monkeypatch.setattr(JiraTraversal, "print_issues", print_issues_and_update)
+    assert "DEMO-1: Issue 1 " in requests.get(server_url + "/query?issues=DEMO-0").text
+    assert events[0]["keys"] == ["DEMO-1"]
+
+    content = requests.get(server_url + "/query?issues=DEMO-0").text
+    assert "DEMO-1: Renamed issue 1 " in content
+
+
+def test_graph_changed_while_generating_stays_stale():
+    dependencies = GraphDependencies()
+    dependencies.begin("graph")
+    assert dependencies.mark_changed(["A-1"]) == []
+    assert not dependencies.register("graph", ["A-1", "A-2"])
+    assert dependencies.is_stale("graph")
+
+    dependencies.begin("graph")
+    dependencies.mark_changed(["A-3"])
+    assert dependencies.register("graph", ["A-1", "A-2"])
+    assert not dependencies.is_stale("graph")
+
+
+def test_invalid_event_is_rejected(server_url):
+    response = requests.post(server_url + "/webhook", data=b'{"webhookEvent": ')
+    assert response.status_code == 400